@@ -1,13 +1,27 @@
+import gc
+import hashlib
 import random
+import time
+from contextlib import nullcontext
 from pathlib import Path
+from typing import List, Optional
 
 import bpy
-from bpy.props import StringProperty, BoolProperty, CollectionProperty, EnumProperty, FloatProperty
+from bpy.props import StringProperty, BoolProperty, CollectionProperty, EnumProperty, FloatProperty, IntProperty
 import numpy as np
-from mathutils import Vector, Euler, Matrix, Quaternion
 
-from .material_lib.material_generator import generate_material
-from .py_xna_lib import parse_ascii_mesh_from_file, parse_bone_names_from_file, parse_ascii_material_from_file
+from .armature_builder import ArmatureBatch
+from .ascii_parser import AsciiModelReader, CHUNK_BYTES_PER_VERTEX, CHUNK_VERTICES
+from .material_lib.material_generator import MaterialCache
+from .material_lib.shader_base import DeferredImageCache
+from .import_plan import MeshPlan, estimate_mesh_bytes, plan_armature, plan_merged_mesh, plan_mesh
+from .mesh_builder import build_mesh
+from .model_data import mesh_hash, skeleton_hash
+from .parse_cache import default_cache_dir
+from .parse_pool import FileBundle, iter_parse_files, load_directory_materials, load_remap_table
+from .profiler import ImportProfiler, count, phase, record, scope
+from .reimport import DatablockSnapshot, ImportedDatablocks, source_id, tag_armature_object, tag_mesh_object
+from .skinning import iter_assign_weights
 
 bl_info = {
     "name": "Blender XNA",
@@ -15,11 +29,26 @@ bl_info = {
     "version": (0, 0, 2),
     "blender": (3, 0, 0),
     "location": "File > Import > XNA",
-    "description": "XNA models (.xna, .ascii)",
+    "description": "XNA models (.ascii, .xps, .mesh)",
     "category": "Import-Export"
 }
 
 
+def remap_bones(bones, remap_table):
+    if remap_table is not None:
+        for bone in bones:
+            bone.name = remap_table.get(bone.name, bone.name)
+
+
+def bind_to_armature(model_objects, armature_obj):
+    for model_obj in model_objects:
+        modifier = next((modifier for modifier in model_obj.modifiers if modifier.type == 'ARMATURE'), None)
+        if modifier is None:
+            modifier = model_obj.modifiers.new(type="ARMATURE", name="Armature")
+        modifier.object = armature_obj
+        model_obj.parent = armature_obj
+
+
 def get_material(mat_name, model_ob):
     md = model_ob.data
     mat = bpy.data.materials.get(mat_name, None)
@@ -38,140 +67,314 @@ def get_material(mat_name, model_ob):
         return len(md.materials) - 1
 
 
-class XNA_OT_ascii_import(bpy.types.Operator):
-    bl_idname = "blender_xna.ascii_import"
-    bl_label = "Import XNA ascii model"
+class XNAImporter:
+    """Shared properties and scene construction of the model import operators.
+
+    The import is a generator of small steps: a parsed file, a mesh or a chunk of vertex weights.
+    execute() runs all of them at once, the interactive mode runs them from a modal timer, TIME_SLICE
+    seconds per timer event, so the UI stays responsive and Esc can cancel the import.
+    """
     bl_options = {'UNDO'}
+    # Seconds of import work per timer event in interactive mode
+    TIME_SLICE = 0.05
+    TIMER_STEP = 0.01
+    # Key of parse_cache.PARSERS used for the selected files
+    parser_name = 'NATIVE'
 
     filepath: StringProperty(subtype="FILE_PATH")
     files: CollectionProperty(name='File paths', type=bpy.types.OperatorFileListElement)
 
     scale: FloatProperty(name="Scale", default=1.0, precision=6)
-    filter_glob: StringProperty(default="*.ascii", options={'HIDDEN'})
+    color_domain: EnumProperty(name="Vertex colors", default='CORNER',
+                               items=(('CORNER', "Face corner", "Store vertex colors per loop, like older versions"),
+                                      ('POINT', "Vertex", "Store vertex colors per vertex in a color attribute, "
+                                                          "avoids expanding them to every loop")))
+    merge_meshes: EnumProperty(name="Merge meshes", default='NONE',
+                               items=(('NONE', "Off", "One object per submesh"),
+                                      ('ARMATURE', "Per armature", "One object per armature, submeshes become "
+                                                                   "material slots"),
+                                      ('MATERIAL', "Per material", "One object per armature and material")),
+                               description="Join submeshes to cut the number of objects. "
+                                           "Not available when streaming meshes")
+
+    use_parse_cache: BoolProperty(name="Use parse cache", default=False,
+                                  description="Keep parsed models in a binary on-disk cache to skip parsing "
+                                              "when the same file is imported again")
+    parse_cache_size: IntProperty(name="Parse cache size (MB)", default=2048, min=64)
+    parse_workers: IntProperty(name="Parse workers", default=0, min=0,
+                               description="Number of processes used to parse selected files, 0 uses all CPUs")
+    update_existing: BoolProperty(name="Update previous import", default=False,
+                                  description="Match meshes and armatures imported from the same files before and "
+                                              "rebuild only the ones whose content changed")
+    deferred_textures: BoolProperty(name="Load textures in background", default=False,
+                                    description="Bind placeholder textures and swap the real ones in after the "
+                                                "import returns. Ignored in background mode")
+    interactive: BoolProperty(name="Interactive import", default=False,
+                              description="Import in small steps between UI updates with a progress indicator, "
+                                          "Esc cancels and removes everything imported so far. "
+                                          "Ignored in background mode")
+
+    profile: BoolProperty(name="Profile import", default=False,
+                          description="Time every import phase and report the totals")
+    profile_memory: BoolProperty(name="Track peak memory", default=False,
+                                 description="Trace Python and NumPy allocations while profiling, slows the import")
+    profile_json_path: StringProperty(name="Profile JSON", subtype="FILE_PATH", default="",
+                                      description="Write the full profile to this JSON file")
 
     def execute(self, context):
+        profiler = ImportProfiler(self.profile_memory) if self.profile else nullcontext()
+        if self.interactive and context.window is not None and not bpy.app.background:
+            return self._start_modal(context, profiler)
+        with profiler:
+            for _ in self._import_steps(context):
+                pass
+        self._report_profile(profiler)
+        return {'FINISHED'}
+
+    def _report_profile(self, profiler):
+        if self.profile:
+            print(profiler.summary())
+            self.report({'INFO'}, profiler.summary())
+            if self.profile_json_path:
+                profiler.write_json(Path(bpy.path.abspath(self.profile_json_path)))
+
+    def _start_modal(self, context, profiler):
+        wm = context.window_manager
+        self._profiler = profiler
+        self._profiler.__enter__()
+        self._steps = self._import_steps(context, cancellable=True)
+        wm.progress_begin(0, max(len(self.files), 1))
+        self._timer = wm.event_timer_add(self.TIMER_STEP, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def _stop_modal(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        self._profiler.__exit__(None, None, None)
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, 'Import cancelled')
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            # Other input is swallowed so the scene can not change under the import
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + self.TIME_SLICE
+        try:
+            while time.perf_counter() < deadline:
+                files_done = next(self._steps)
+                if files_done is not None:
+                    context.window_manager.progress_update(files_done)
+        except StopIteration:
+            self._stop_modal(context)
+            self._report_profile(self._profiler)
+            return {'FINISHED'}
+        except Exception:
+            self._stop_modal(context)
+            raise
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        # Esc, or Blender ending the operator on file load or window close.
+        # Closing the steps rolls back everything they did
+        self._steps.close()
+        self._stop_modal(context)
+
+    def _import_steps(self, context, cancellable: bool = False):
+        """Import the selected files, yielding between steps. Yielded numbers count the files done so far.
+
+        When cancellable, closing the generator early or an error removes every datablock created
+        so far and restores the objects an update import changed.
+        """
         if Path(self.filepath).is_file():
             directory = Path(self.filepath).parent.absolute()
         else:
             directory = Path(self.filepath).absolute()
-
-        for file in self.files:
-            file = Path(directory / file.name)
-            external_skeleton_path = file.with_name(file.stem + '_skel.ascii')
-            remap_path = file.with_name('bonenames.txt')
-            if remap_path.exists():
-                print('Loading remap table')
-                remap_table = parse_bone_names_from_file(remap_path.as_posix())
-            else:
-                remap_table = None
-            if external_skeleton_available := external_skeleton_path.exists():
-                skeleton = parse_ascii_mesh_from_file(external_skeleton_path.as_posix())
-            else:
-                skeleton = None
-            model = parse_ascii_mesh_from_file(file.as_posix(), external_skeleton_available)
-            bone_source = skeleton or model
-            for bone in bone_source.bones:
-                if remap_table is not None:
-                    bone.name = remap_table.get(bone.name, bone.name)
-            model_objects = []
+        files = [Path(directory / file.name) for file in self.files]
+        snapshot = DatablockSnapshot() if cancellable else None
+        # Timers never fire in background mode, textures are loaded right away there
+        image_cache = DeferredImageCache() if self.deferred_textures and not bpy.app.background else None
+        material_cache = MaterialCache(directory, image_cache=image_cache)
+        armatures = ArmatureBatch()
+        imported = ImportedDatablocks(undoable=cancellable) if self.update_existing else None
+
+        try:
+            yield from self._import_files(files, material_cache, armatures, imported, cancellable)
+            with phase('armature'):
+                armatures.build()
+        except BaseException:
+            if cancellable:
+                if imported is not None:
+                    imported.rollback()
+                snapshot.remove_created()
+            raise
+        if imported is not None:
+            imported.commit()
+            self.report({'INFO'}, f'Update: {imported.updated} meshes rebuilt, {imported.skipped} unchanged')
+
+        image_cache = material_cache.image_cache
+        self.report({'INFO'}, f'Materials: {material_cache.built} built, {material_cache.skipped} reused; '
+                              f'Textures: {image_cache.hits} reused, {image_cache.misses} loaded')
+        if isinstance(image_cache, DeferredImageCache) and image_cache.pending:
+            self.report({'INFO'}, f'{image_cache.pending} textures are loading in the background')
+
+    def _import_files(self, files: List[Path], material_cache: MaterialCache, armatures: ArmatureBatch,
+                      imported: Optional[ImportedDatablocks], interactive: bool = False):
+        cache_dir = default_cache_dir().as_posix() if self.use_parse_cache else None
+        # Interactive imports never parse on the main thread, a long parse would hold back Esc
+        parsing = iter_parse_files(files, self.parse_workers, cache_dir, self.parse_cache_size * 1024 ** 2,
+                                   self.parser_name, background=interactive)
+        bundles = []
+        merge_groups = {}
+        # Files are imported as soon as they are parsed, while the pool works on the next ones
+        while len(bundles) < len(files):
+            with phase('parse'):
+                bundle = next(parsing)
+            if bundle is None:
+                yield
+                continue
+            bundles.append(bundle)
+            with scope(file=bundle.path.name):
+                yield from self._import_bundle(bundle, material_cache, armatures, imported, merge_groups)
+            yield len(bundles)
+        for name, source, bone_names, armature_obj, meshes, materials, hashes in merge_groups.values():
+            with scope(mesh=name):
+                content_hash = hashlib.sha1('|'.join(hashes).encode('utf8')).hexdigest()
+                mesh_obj = imported.claim_mesh_object(source, name) if imported is not None else None
+                if not self._reuse_unchanged(mesh_obj, content_hash, materials, material_cache, imported):
+                    with phase('plan'):
+                        mesh_plan = plan_merged_mesh(name, meshes, materials, self.scale, bone_names,
+                                                     self.color_domain == 'POINT')
+                    mesh_obj = yield from self._build_object(mesh_plan, material_cache, source, content_hash,
+                                                             mesh_obj, imported)
+                bind_to_armature([mesh_obj], armature_obj)
+            yield
+        if self.use_parse_cache:
+            hits = sum(bundle.cache_hits for bundle in bundles)
+            misses = sum(bundle.cache_misses for bundle in bundles)
+            self.report({'INFO'}, f'Parse cache: {hits} hits, {misses} misses')
+
+    def _import_bundle(self, bundle: FileBundle, material_cache: MaterialCache, armatures: ArmatureBatch,
+                       imported: Optional[ImportedDatablocks], merge_groups: dict):
+        record('parse_file', bundle.parse_seconds)
+        model = bundle.model
+        bone_source = bundle.skeleton or model
+        remap_bones(bone_source.bones, bundle.remap_table)
+        bone_names = None
+        if bundle.skeleton is not None or model.bones:
+            bone_names = [bone.name for bone in bone_source.bones]
+        with phase('armature'):
+            armature_obj = self._get_armature(bundle.path, bone_source.bones, armatures, imported)
+
+        if self.merge_meshes != 'NONE':
+            # Collected across files, models sharing an armature end up in the same objects
             for mesh in model.meshes:
-                mesh_name = mesh.name
-                mesh_data = bpy.data.meshes.new(f'{mesh_name}_MESH')
-                mesh_obj = bpy.data.objects.new(mesh_name, mesh_data)
-
-                vertices = np.asarray(mesh.vertices, np.float32)
-                vertices[:, 0], vertices[:, 1], vertices[:, 2] = (
-                    vertices[:, 2].copy(), vertices[:, 0].copy(), vertices[:, 1].copy())
-
-                mesh_data.from_pydata(vertices * self.scale, [], mesh.indices)
-                mesh_data.update()
-                del vertices
-                mesh_data.polygons.foreach_set("use_smooth", np.ones(len(mesh_data.polygons), np.uint32))
-                normals = np.asarray(mesh.normals, np.float32)
-                normals[:, 0], normals[:, 1], normals[:, 2] = (normals[:, 2].copy(),
-                                                               normals[:, 0].copy(),
-                                                               normals[:, 1].copy())
-                mesh_data.normals_split_custom_set_from_vertices(normals * -1)
-                mesh_data.use_auto_smooth = True
-                if mesh.material:
-                    amat_path = file.with_name(mesh.material.name + '.amat')
-                    material = mesh.material
-                    if amat_path.exists():
-                        material = parse_ascii_material_from_file(amat_path.as_posix())
-                    get_material(material.name, mesh_obj)
-                    generate_material(material, directory)
-
-                vertex_indices = np.zeros((len(mesh_data.loops, )), dtype=np.uint32)
-                mesh_data.loops.foreach_get('vertex_index', vertex_indices)
-
-                for uv_layer_id, uv_layer_data in mesh.uv_layers.items():
-                    uv_data = mesh_data.uv_layers.new(name=f'UV_{uv_layer_id}')
-                    uv_layer_data = np.array(uv_layer_data, np.float32)
-                    uv_layer_data[:, 1] = 1 - uv_layer_data[:, 1]
-                    uv_data.data.foreach_set('uv', uv_layer_data[vertex_indices].flatten())
-
-                vc = mesh_data.vertex_colors.new()
-                colors = np.array(mesh.vertex_colors, np.float32)
-                vc.data.foreach_set('color', colors[vertex_indices].flatten())
-
-                if external_skeleton_available or model.bones:
-                    weight_groups = {bone.name: mesh_obj.vertex_groups.new(name=bone.name) for bone in
-                                     bone_source.bones}
-
-                    for n, (bone_indices, bone_weights) in enumerate(zip(mesh.bone_ids, mesh.weights)):
-                        for bone_index, weight in zip(bone_indices, bone_weights):
-                            if weight > 0:
-                                bone_name = bone_source.bones[bone_index].name
-                                weight_groups[bone_name].add([n], weight, 'REPLACE')
-                else:
-                    bone_ids = []
-                    for bone_ids_ in mesh.bone_ids:
-                        bone_ids.extend(bone_ids_)
-                    bone_ids = set(bone_ids)
-                    weight_groups = {str(bone): mesh_obj.vertex_groups.new(name=str(bone)) for bone in bone_ids}
-                    for n, (bone_indices, bone_weights) in enumerate(zip(mesh.bone_ids, mesh.weights)):
-                        for bone_index, weight in zip(bone_indices, bone_weights):
-                            if weight > 0:
-                                bone_name = str(bone_index)
-                                weight_groups[bone_name].add([n], weight, 'REPLACE')
-
-                bpy.context.scene.collection.objects.link(mesh_obj)
-                model_objects.append(mesh_obj)
-
-            armature = bpy.data.armatures.new(f"{file.stem}_ARM_DATA")
-            armature_obj = bpy.data.objects.new(f"{file.stem}_ARM", armature)
-            armature_obj.show_in_front = True
-            bpy.context.scene.collection.objects.link(armature_obj)
-
-            armature_obj.select_set(True)
-            bpy.context.view_layer.objects.active = armature_obj
-
-            bpy.ops.object.mode_set(mode='EDIT')
-            bl_bones = []
-            for bone in bone_source.bones:
-                if remap_table is not None:
-                    bone.name = remap_table.get(bone.name, bone.name)
-                bl_bone = armature.edit_bones.new(bone.name[-63:])
-                bl_bones.append(bl_bone)
-
-            for bl_bone, s_bone in zip(bl_bones, bone_source.bones):
-                if s_bone.parent_id != -1:
-                    bl_parent = bl_bones[s_bone.parent_id]
-                    bl_bone.parent = bl_parent
-                bl_bone.head = (Vector(s_bone.blender_pos) * self.scale)
-                bl_bone.tail = bl_bone.head + ((Vector([0, 0.05, 0]) * self.scale))
-                if s_bone.quat:
-                    quat = Quaternion(s_bone.blender_quat).to_matrix().to_4x4()
-                    bl_bone.matrix = Matrix.Translation(s_bone.blender_pos) @ quat
-
-            for model_obj in model_objects:
-                modifier = model_obj.modifiers.new(type="ARMATURE", name="Armature")
-                modifier.object = armature_obj
-                model_obj.parent = armature_obj
-
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-        return {'FINISHED'}
+                material = bundle.materials.get(mesh.material.name, mesh.material) if mesh.material else None
+                material_key = material.name if self.merge_meshes == 'MATERIAL' and material else None
+                group = merge_groups.setdefault((armature_obj.name, material_key),
+                                                (material_key or bundle.path.stem, source_id(bundle.path), bone_names,
+                                                 armature_obj, [], [], []))
+                group[4].append(mesh)
+                group[5].append(material)
+                with phase('hash'):
+                    group[6].append(self._mesh_hash(mesh, bone_names, material))
+                yield
+            return
+
+        model_objects = []
+        for mesh in model.meshes:
+            with scope(mesh=mesh.name):
+                model_objects.append((yield from self._import_mesh(mesh, bone_names, bundle.materials,
+                                                                   material_cache, source_id(bundle.path),
+                                                                   imported)))
+            yield
+        bind_to_armature(model_objects, armature_obj)
+
+    def _mesh_hash(self, mesh, bone_names: Optional[List[str]], material) -> str:
+        return mesh_hash(mesh, self.scale, self.color_domain, bone_names, material.name if material else None)
+
+    def _reuse_unchanged(self, mesh_obj, content_hash: str, materials: list, material_cache: MaterialCache,
+                         imported: Optional[ImportedDatablocks]) -> bool:
+        """Whether an object of a previous import has an unchanged mesh, its materials are still refreshed."""
+        if imported is None or not imported.is_unchanged(mesh_obj, content_hash):
+            return False
+        imported.skipped += 1
+        with phase('materials'):
+            for material in materials:
+                if material is not None:
+                    material_cache.build(material)
+        return True
+
+    def _import_mesh(self, mesh, bone_names: Optional[List[str]], materials: dict, material_cache: MaterialCache,
+                     source: str, imported: Optional[ImportedDatablocks]):
+        material = materials.get(mesh.material.name, mesh.material) if mesh.material else None
+        with phase('hash'):
+            content_hash = self._mesh_hash(mesh, bone_names, material)
+        mesh_obj = imported.claim_mesh_object(source, mesh.name) if imported is not None else None
+        if self._reuse_unchanged(mesh_obj, content_hash, [material], material_cache, imported):
+            return mesh_obj
+        with phase('plan'):
+            mesh_plan = plan_mesh(mesh, self.scale, bone_names, self.color_domain == 'POINT')
+        mesh_plan.material = material
+        return (yield from self._build_object(mesh_plan, material_cache, source, content_hash, mesh_obj, imported))
+
+    def _build_object(self, mesh_plan: MeshPlan, material_cache: MaterialCache, source: str, content_hash: str,
+                      mesh_obj, imported: Optional[ImportedDatablocks]):
+        """Build a mesh into mesh_obj, an object claimed from a previous import, or into a new object."""
+        mesh_name = f'{mesh_plan.name}_MESH'
+        mesh_data = bpy.data.meshes.new(mesh_name)
+        if mesh_obj is not None:
+            # Keep the object, its transform, modifiers and collections, only the geometry is replaced
+            imported.replace_mesh(mesh_obj, mesh_data, mesh_name)
+        else:
+            mesh_obj = bpy.data.objects.new(mesh_plan.name, mesh_data)
+            bpy.context.scene.collection.objects.link(mesh_obj)
+        tag_mesh_object(mesh_obj, source, mesh_plan.name, content_hash)
+
+        build_mesh(mesh_data, mesh_plan)
+        yield
+        materials = mesh_plan.materials or ([mesh_plan.material] if mesh_plan.material else [])
+        if materials:
+            with phase('materials'):
+                slots = []
+                for material in materials:
+                    slots.append(get_material(material.name, mesh_obj))
+                    material_cache.build(material)
+                if mesh_plan.face_material_ids is not None:
+                    mesh_data.polygons.foreach_set('material_index',
+                                                   np.asarray(slots, np.int32)[mesh_plan.face_material_ids])
+                    count('rna_bulk_calls')
+
+        with phase('weights'):
+            yield from iter_assign_weights(mesh_obj, mesh_plan.weights)
+        del mesh_plan
+        return mesh_obj
+
+    def _get_armature(self, path: Path, bones: list, armatures: ArmatureBatch,
+                      imported: Optional[ImportedDatablocks]):
+        # Models sharing a skeleton bind to one armature, bone-less models keep their own empty one
+        skeleton_key = skeleton_hash(bones) if bones else None
+        armature_obj = armatures.get(skeleton_key)
+        if armature_obj is not None:
+            return armature_obj
+
+        source = source_id(path)
+        existing, up_to_date = imported.armature_object(source, skeleton_key) if imported is not None else (None, False)
+        if existing is not None and up_to_date:
+            armature_obj = armatures.reuse(existing, skeleton_key)
+        elif existing is not None:
+            armature_obj = armatures.rebuild(existing, plan_armature(bones, self.scale), skeleton_key)
+        else:
+            armature_obj = armatures.add(path.stem, plan_armature(bones, self.scale), skeleton_key)
+        if imported is not None:
+            imported.tag_armature(armature_obj, source, skeleton_key)
+        else:
+            tag_armature_object(armature_obj, source, skeleton_key)
+        return armature_obj
 
     def invoke(self, context, event):
         wm = context.window_manager
@@ -179,6 +382,96 @@ class XNA_OT_ascii_import(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
 
+class XNA_OT_ascii_import(XNAImporter, bpy.types.Operator):
+    bl_idname = "blender_xna.ascii_import"
+    bl_label = "Import XNA ascii model"
+
+    filter_glob: StringProperty(default="*.ascii", options={'HIDDEN'})
+
+    parser: EnumProperty(name="Parser", default='NATIVE',
+                         items=(('NATIVE', "py_xna_lib", "Parse with the py_xna_lib module"),
+                                ('NUMPY', "NumPy streaming",
+                                 "Parse in chunks straight into NumPy arrays, uses less memory on large files")))
+
+    streaming: BoolProperty(name="Stream meshes", default=False,
+                            description="Read, build and release one mesh at a time to bound memory use. "
+                                        "Always uses the NumPy parser and skips the parse cache")
+    memory_budget: IntProperty(name="Memory budget (MB)", default=2048, min=64,
+                               description="Advisory when streaming: small budgets shrink the parse chunks and "
+                                           "release memory after every large mesh, meshes over the budget "
+                                           "are still imported with a warning")
+
+    @property
+    def parser_name(self):
+        return self.parser
+
+    def _import_files(self, files: List[Path], material_cache: MaterialCache, armatures: ArmatureBatch,
+                      imported: Optional[ImportedDatablocks], interactive: bool = False):
+        if self.streaming:
+            yield from self._import_streaming(files, material_cache, armatures, imported)
+        else:
+            yield from super()._import_files(files, material_cache, armatures, imported, interactive)
+
+    def _import_streaming(self, files: List[Path], material_cache: MaterialCache, armatures: ArmatureBatch,
+                          imported: Optional[ImportedDatablocks]):
+        """Import meshes one at a time, releasing each before the next one is read.
+
+        Skeletons, bone remap tables and .amat materials are resolved before the first mesh,
+        so every mesh can bind to its armature as soon as it is built.
+        """
+        budget = self.memory_budget * 1024 ** 2
+        # Text and parsed values of one chunk stay well under the budget, larger chunks than the
+        # default would not parse any faster
+        chunk_vertices = min(CHUNK_VERTICES, max(1024, budget // 8 // CHUNK_BYTES_PER_VERTEX))
+        with phase('parse'):
+            # Every selected file comes from the same directory
+            remap_table = load_remap_table(material_cache.root_dir / 'bonenames.txt')
+            materials = load_directory_materials(material_cache.root_dir)
+        for files_done, file in enumerate(files, 1):
+            with scope(file=file.name):
+                with phase('parse'):
+                    skeleton_path = file.with_name(file.stem + '_skel.ascii')
+                    skeleton_bones = None
+                    if skeleton_path.exists():
+                        with AsciiModelReader(skeleton_path) as skeleton_reader:
+                            skeleton_bones = skeleton_reader.bones
+
+                with AsciiModelReader(file, skeleton_bones is not None, chunk_vertices) as reader:
+                    bones = skeleton_bones if skeleton_bones is not None else reader.bones
+                    remap_bones(bones, remap_table)
+                    bone_names = [bone.name for bone in bones] if reader.has_weights else None
+                    with phase('armature'):
+                        armature_obj = self._get_armature(file, bones, armatures, imported)
+
+                    meshes = reader.iter_meshes()
+                    while True:
+                        with phase('parse'):
+                            mesh = next(meshes, None)
+                        if mesh is None:
+                            break
+                        with scope(mesh=mesh.name):
+                            mesh_bytes = estimate_mesh_bytes(mesh, self.color_domain == 'POINT')
+                            if mesh_bytes > budget:
+                                self.report({'WARNING'}, f'{mesh.name} needs about {mesh_bytes // 1024 ** 2} MB, '
+                                                         f'over the {self.memory_budget} MB budget')
+                            mesh_obj = yield from self._import_mesh(mesh, bone_names, materials, material_cache,
+                                                                    source_id(file), imported)
+                            bind_to_armature([mesh_obj], armature_obj)
+                        del mesh
+                        if mesh_bytes > budget // 8:
+                            gc.collect()
+                        yield
+            yield files_done
+
+
+class XNA_OT_xps_import(XNAImporter, bpy.types.Operator):
+    bl_idname = "blender_xna.xps_import"
+    bl_label = "Import XNA binary model"
+
+    filter_glob: StringProperty(default="*.xps;*.mesh", options={'HIDDEN'})
+    parser_name = 'XPS'
+
+
 class XNA_MT_Menu(bpy.types.Menu):
     bl_label = "XNA models"
     bl_idname = "XNA_MT_Menu"
@@ -186,7 +479,7 @@ class XNA_MT_Menu(bpy.types.Menu):
     def draw(self, context):
         layout = self.layout
         layout.operator(XNA_OT_ascii_import.bl_idname, text="XNA mesh (.ascii)")
-        # layout.operator(XNA_OT_ASCIIImport.bl_idname, text="XNA mesh (.xps) TODO!")
+        layout.operator(XNA_OT_xps_import.bl_idname, text="XNA mesh (.xps, .mesh)")
 
 
 def menu_import(self, context):
@@ -196,6 +489,7 @@ def menu_import(self, context):
 classes = (
     XNA_MT_Menu,
     XNA_OT_ascii_import,
+    XNA_OT_xps_import,
 )
 
 register_, unregister_ = bpy.utils.register_classes_factory(classes)
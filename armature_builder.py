@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+import numpy as np
+
+from .import_plan import ArmaturePlan
+from .profiler import count
+
+
+def _set_mode(view_layer, objects, mode: str):
+    """Switch objects into mode with one operator call, using an explicit context so it also works
+    from background mode, timers or handlers where bpy.context has no usable view layer."""
+    for selected in list(view_layer.objects.selected):
+        selected.select_set(False, view_layer=view_layer)
+    for obj in objects:
+        obj.select_set(True, view_layer=view_layer)
+    view_layer.objects.active = objects[0]
+    override = {'scene': bpy.context.scene, 'view_layer': view_layer, 'active_object': objects[0],
+                'object': objects[0], 'selected_objects': objects, 'selected_editable_objects': objects}
+    if hasattr(bpy.context, 'temp_override'):
+        with bpy.context.temp_override(**override):
+            bpy.ops.object.mode_set(mode=mode)
+    else:
+        bpy.ops.object.mode_set(override, mode=mode)
+
+
+def _active_view_layer():
+    return bpy.context.view_layer or bpy.context.scene.view_layers[0]
+
+
+def _build_bones(armature, plan: ArmaturePlan):
+    for edit_bone in list(armature.edit_bones):
+        armature.edit_bones.remove(edit_bone)
+    bl_bones = [armature.edit_bones.new(bone_name[-63:]) for bone_name in plan.names]
+    edit_bones = armature.edit_bones
+    edit_bones.foreach_set('head', np.ascontiguousarray(plan.heads, np.float32).ravel())
+    edit_bones.foreach_set('tail', np.ascontiguousarray(plan.tails, np.float32).ravel())
+    if plan.has_rotation.any():
+        # Bones without rotation carry an identity rotation, which keeps their head, tail and zero roll.
+        # RNA matrices are column-major, the plan is row-major
+        edit_bones.foreach_set('matrix', np.ascontiguousarray(plan.matrices.transpose((0, 2, 1)), np.float32).ravel())
+    for n, parent_id in enumerate(plan.parent_ids.tolist()):
+        if parent_id != -1:
+            bl_bones[n].parent = bl_bones[parent_id]
+    count('rna_bulk_calls', 3)
+    count('python_loop_iterations', len(plan.names) * 2)
+
+
+class ArmatureBatch:
+    """Creates armature objects right away and all of their bones in a single edit mode session.
+
+    Meshes can be bound to the armature objects before their bones exist, the armature modifier
+    resolves vertex groups by name when the depsgraph is evaluated.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, object] = {}
+        self._pending: List[Tuple[object, ArmaturePlan]] = []
+        self._rebuilt = set()
+
+    def get(self, key: Optional[str]):
+        return self._by_key.get(key) if key is not None else None
+
+    def add(self, name: str, plan: ArmaturePlan, key: Optional[str] = None):
+        armature = bpy.data.armatures.new(f"{name}_ARM_DATA")
+        armature_obj = bpy.data.objects.new(f"{name}_ARM", armature)
+        armature_obj.show_in_front = True
+        bpy.context.scene.collection.objects.link(armature_obj)
+        self._pending.append((armature_obj, plan))
+        if key is not None:
+            self._by_key[key] = armature_obj
+        return armature_obj
+
+    def reuse(self, armature_obj, key: Optional[str] = None):
+        """Register an existing armature object whose bones are already up to date."""
+        if key is not None:
+            self._by_key[key] = armature_obj
+        return armature_obj
+
+    def rebuild(self, armature_obj, plan: ArmaturePlan, key: Optional[str] = None):
+        """Replace the bones of an existing armature object during build()."""
+        self._pending.append((armature_obj, plan))
+        self._rebuilt.add(armature_obj.name)
+        if key is not None:
+            self._by_key[key] = armature_obj
+        return armature_obj
+
+    def build(self):
+        pending = [(armature_obj, plan) for armature_obj, plan in self._pending
+                   if plan.names or armature_obj.name in self._rebuilt]
+        self._pending.clear()
+        self._rebuilt.clear()
+        if not pending:
+            return
+        view_layer = _active_view_layer()
+        armature_objs = [armature_obj for armature_obj, _ in pending]
+        _set_mode(view_layer, armature_objs, 'EDIT')
+        try:
+            for armature_obj, plan in pending:
+                _build_bones(armature_obj.data, plan)
+        finally:
+            _set_mode(view_layer, armature_objs, 'OBJECT')
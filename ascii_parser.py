@@ -0,0 +1,240 @@
+"""Streaming NumPy parser for XNALara ASCII (.ascii) models.
+
+Vertex and face blocks are read in chunks of lines and converted with np.fromstring straight
+into arrays preallocated from the counts declared in the file, so no per-vertex Python lists are
+built and a file never sits in memory as text and lists at the same time.
+"""
+import warnings
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from .model_data import BoneData, MaterialData, MeshData, ModelData, widen_influences
+from .render_groups import texture_roles
+
+CHUNK_VERTICES = 32768
+# Rough cost of one vertex while its chunk is parsed: text lines plus float values
+CHUNK_BYTES_PER_VERTEX = 512
+
+
+class AsciiParseError(ValueError):
+    pass
+
+
+class _LineReader:
+    def __init__(self, file):
+        self._file = file
+        self._pending = deque()
+        self.line_number = 0
+
+    def raw_lines(self, count: int) -> List[bytes]:
+        lines = []
+        while self._pending and len(lines) < count:
+            lines.append(self._pending.popleft())
+        if len(lines) < count:
+            lines.extend(islice(self._file, count - len(lines)))
+        self.line_number += len(lines)
+        return lines
+
+    def push_back(self, lines: List[bytes]):
+        self._pending.extendleft(reversed(lines))
+        self.line_number -= len(lines)
+
+    def value_line(self) -> bytes:
+        """Next line with its comment removed, skipping empty lines."""
+        while True:
+            lines = self.raw_lines(1)
+            if not lines:
+                raise AsciiParseError(f'Unexpected end of file after line {self.line_number}')
+            value = lines[0].split(b'#', 1)[0].strip()
+            if value:
+                return value
+
+    def text(self) -> str:
+        return self.value_line().decode('utf8', errors='replace')
+
+    def int(self) -> int:
+        return int(self.value_line().split()[0])
+
+    def numbers(self, dtype=np.float32) -> np.ndarray:
+        return np.array(self.value_line().split(), dtype)
+
+
+def _parse_numbers(blob: bytes, dtype) -> np.ndarray:
+    with warnings.catch_warnings():
+        # Malformed data shows up as a short result, callers compare the count
+        warnings.simplefilter('ignore', DeprecationWarning)
+        return np.fromstring(blob, dtype=dtype, sep=' ')
+
+
+def _token_counts(lines: List[bytes]) -> np.ndarray:
+    """Number of whitespace separated values on every newline terminated line."""
+    data = np.frombuffer(b''.join(lines), np.uint8)
+    space = data <= 32
+    # A value starts at every non-space byte that follows a space or the start of the data
+    starts = ~space
+    starts[1:] &= space[:-1]
+    values_before_line_end = np.searchsorted(np.flatnonzero(starts), np.flatnonzero(data == ord('\n')))
+    return np.diff(values_before_line_end, prepend=0)
+
+
+class AsciiModelReader:
+    """Reads the bone header up front, then yields meshes one at a time."""
+
+    def __init__(self, path: Path, external_skeleton: bool = False, chunk_vertices: int = CHUNK_VERTICES):
+        self.path = Path(path)
+        self.external_skeleton = external_skeleton
+        self.chunk_vertices = chunk_vertices
+        self._file = None
+        self._reader: Optional[_LineReader] = None
+        self.bones: List[BoneData] = []
+        self.mesh_count = 0
+
+    def __enter__(self):
+        self._file = self.path.open('rb')
+        self._reader = _LineReader(self._file)
+        self._read_header()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._file.close()
+
+    def _read_header(self):
+        reader = self._reader
+        for _ in range(reader.int()):
+            name = reader.text()
+            parent_id = reader.int()
+            x, y, z = reader.numbers(np.float64)[:3].tolist()
+            self.bones.append(BoneData(name, parent_id, (z, x, y)))
+        self.mesh_count = reader.int()
+
+    @property
+    def has_weights(self):
+        return bool(self.bones) or self.external_skeleton
+
+    def iter_meshes(self) -> Iterator[MeshData]:
+        for _ in range(self.mesh_count):
+            yield self._read_mesh()
+
+    def _read_mesh(self) -> MeshData:
+        reader = self._reader
+        name = reader.text()
+        uv_layer_count = reader.int()
+        textures = [(reader.text(), reader.int()) for _ in range(reader.int())]
+        textures = dict(zip(texture_roles(name, len(textures)), textures))
+        vertex_count = reader.int()
+
+        vertices = np.empty((vertex_count, 3), np.float32)
+        normals = np.empty((vertex_count, 3), np.float32)
+        colors = np.empty((vertex_count, 4), np.float32)
+        uvs = np.empty((uv_layer_count, vertex_count, 2), np.float32)
+        influences = self._peek_influence_count(uv_layer_count) if self.has_weights and vertex_count else 0
+        bone_ids = np.zeros((vertex_count, influences), np.int32)
+        weights = np.zeros((vertex_count, influences), np.float32)
+        arrays = [vertices, normals, colors, uvs, bone_ids, weights]
+
+        for start in range(0, vertex_count, self.chunk_vertices):
+            end = min(start + self.chunk_vertices, vertex_count)
+            arrays = self._read_vertex_chunk(arrays, start, end, uv_layer_count)
+        vertices, normals, colors, uvs, bone_ids, weights = arrays
+        colors *= 1 / 255
+
+        face_count = reader.int()
+        indices = np.empty((face_count, 3), np.int32)
+        for start in range(0, face_count, self.chunk_vertices):
+            end = min(start + self.chunk_vertices, face_count)
+            indices[start:end] = self._read_face_chunk(end - start)
+
+        material = MaterialData(name, textures)
+        return MeshData(name, vertices, normals, colors, {n: uvs[n] for n in range(uv_layer_count)},
+                        indices, bone_ids, weights, material)
+
+    def _peek_influence_count(self, uv_layer_count: int) -> int:
+        # Bone index line of the first vertex tells how many influences the file uses
+        reader = self._reader
+        lines = []
+        values = []
+        while len(values) < 4 + uv_layer_count:
+            line = reader.raw_lines(1)
+            if not line:
+                break
+            lines.append(line[0])
+            value = line[0].split(b'#', 1)[0].split()
+            if value:
+                values.append(value)
+        reader.push_back(lines)
+        return len(values[3 + uv_layer_count]) if len(values) > 3 + uv_layer_count else 0
+
+    def _read_vertex_chunk(self, arrays, start: int, end: int, uv_layer_count: int):
+        reader = self._reader
+        vertices, normals, colors, uvs, bone_ids, weights = arrays
+        influences = bone_ids.shape[1]
+        count = end - start
+        lines_per_vertex = 3 + uv_layer_count + (2 if self.has_weights else 0)
+        values_per_vertex = 10 + 2 * uv_layer_count + 2 * influences
+
+        lines = reader.raw_lines(count * lines_per_vertex)
+        blob = b' '.join(lines)
+        if b'#' not in blob and self._uniform_influences(lines, lines_per_vertex, influences):
+            values = _parse_numbers(blob, np.float32)
+            if len(values) == count * values_per_vertex:
+                values = values.reshape((count, values_per_vertex))
+                vertices[start:end] = values[:, 0:3]
+                normals[start:end] = values[:, 3:6]
+                colors[start:end] = values[:, 6:10]
+                offset = 10
+                for n in range(uv_layer_count):
+                    uvs[n, start:end] = values[:, offset:offset + 2]
+                    offset += 2
+                if influences:
+                    bone_ids[start:end] = values[:, offset:offset + influences]
+                    weights[start:end] = values[:, offset + influences:offset + 2 * influences]
+                return arrays
+
+        # Comments, blank lines or a varying influence count, parse this chunk vertex by vertex
+        reader.push_back(lines)
+        for n in range(start, end):
+            vertices[n] = reader.numbers()[:3]
+            normals[n] = reader.numbers()[:3]
+            colors[n] = reader.numbers()[:4]
+            for layer in range(uv_layer_count):
+                uvs[layer, n] = reader.numbers()[:2]
+            if self.has_weights:
+                vertex_bones = reader.numbers(np.int32)
+                vertex_weights = reader.numbers()
+                width = min(len(vertex_bones), len(vertex_weights))
+                if width > bone_ids.shape[1]:
+                    bone_ids, weights = widen_influences(bone_ids, weights, width)
+                row_ids, row_weights = widen_influences(vertex_bones[None, :width], vertex_weights[None, :width],
+                                                        bone_ids.shape[1])
+                bone_ids[n], weights[n] = row_ids[0], row_weights[0]
+        return [vertices, normals, colors, uvs, bone_ids, weights]
+
+    def _uniform_influences(self, lines: List[bytes], lines_per_vertex: int, influences: int) -> bool:
+        # Influence counts varying inside a chunk can still add up to the expected total,
+        # so the bone index and weight lines of every vertex are counted
+        if not self.has_weights:
+            return True
+        influence_lines = lines[lines_per_vertex - 2::lines_per_vertex] + lines[lines_per_vertex - 1::lines_per_vertex]
+        counts = _token_counts(influence_lines)
+        # A missing line end, only possible on the last line of a file, also takes the slow path
+        return len(counts) == len(influence_lines) and bool(np.all(counts == influences))
+
+    def _read_face_chunk(self, count: int) -> np.ndarray:
+        reader = self._reader
+        lines = reader.raw_lines(count)
+        blob = b' '.join(lines)
+        if b'#' not in blob:
+            values = _parse_numbers(blob, np.int32)
+            if len(values) == count * 3:
+                return values.reshape((count, 3))
+        reader.push_back(lines)
+        return np.array([reader.numbers(np.int32)[:3] for _ in range(count)], np.int32).reshape((count, 3))
+
+
+def parse_ascii_mesh(path: Path, external_skeleton: bool = False) -> ModelData:
+    with AsciiModelReader(path, external_skeleton) as reader:
+        return ModelData(reader.bones, list(reader.iter_meshes()))
@@ -0,0 +1,219 @@
+"""Convert every .ascii model under a directory to one .blend file each, in parallel background Blender processes.
+
+Run with: python batch_convert.py INPUT_DIR [-o OUTPUT_DIR] [-j JOBS] [--blender PATH]
+
+The coordinator only needs a plain Python interpreter. Models are split into one shard per worker,
+balanced by file size, and every worker is a `blender --background` process running this script
+with --worker, which imports its models one at a time into an empty scene and saves them.
+Outputs newer than their model and its companion files are skipped, so an interrupted run
+resumes where it stopped. Per-file timings and errors are printed and written to batch_summary.json.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ADDON_DIR = Path(__file__).absolute().parent
+PACKAGE_NAME = 'blender_xna'
+SUMMARY_NAME = 'batch_summary.json'
+LOG_DIR_NAME = 'batch_logs'
+
+
+@dataclass
+class ConvertJob:
+    source: str
+    output: str
+    size: int = 0
+
+
+def companion_files(model: Path) -> List[Path]:
+    """Files next to a model that change the converted result: skeleton, bone remap table and materials."""
+    candidates = [model.with_name(model.stem + '_skel.ascii'), model.with_name('bonenames.txt')]
+    return [path for path in candidates if path.exists()] + sorted(model.parent.glob('*.amat'))
+
+
+def is_up_to_date(model: Path, output: Path) -> bool:
+    if not output.exists():
+        return False
+    output_mtime = output.stat().st_mtime_ns
+    return all(path.stat().st_mtime_ns <= output_mtime for path in [model, *companion_files(model)])
+
+
+def discover_jobs(input_dir: Path, output_dir: Path) -> List[ConvertJob]:
+    jobs = []
+    for model in sorted(input_dir.rglob('*.ascii')):
+        if model.name.endswith('_skel.ascii'):
+            # Skeletons are imported together with their model
+            continue
+        output = output_dir / model.relative_to(input_dir).with_suffix('.blend')
+        jobs.append(ConvertJob(model.as_posix(), output.as_posix(), model.stat().st_size))
+    return jobs
+
+
+def shard_jobs(jobs: List[ConvertJob], count: int) -> List[List[ConvertJob]]:
+    """Split jobs into count shards of similar total file size, largest files first."""
+    shards = [[] for _ in range(count)]
+    loads = [0] * count
+    for job in sorted(jobs, key=lambda job: job.size, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(job)
+        loads[lightest] += job.size
+    return [shard for shard in shards if shard]
+
+
+def run_workers(shards: List[List[ConvertJob]], blender: str, options: dict, log_dir: Path) -> List[dict]:
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='blender_xna_batch_') as work_dir:
+        workers = []
+        for n, shard in enumerate(shards):
+            shard_path = Path(work_dir, f'shard_{n}.json')
+            results_path = Path(work_dir, f'results_{n}.jsonl')
+            shard_path.write_text(json.dumps({'jobs': [asdict(job) for job in shard], 'options': options,
+                                              'results': results_path.as_posix()}))
+            log_path = log_dir / f'worker_{n}.log'
+            with log_path.open('w') as log:
+                process = subprocess.Popen([blender, '--background', '--factory-startup', '--python-exit-code', '1',
+                                            '--python', Path(__file__).absolute().as_posix(),
+                                            '--', '--worker', shard_path.as_posix()],
+                                           stdout=log, stderr=subprocess.STDOUT)
+            workers.append((process, shard, results_path, log_path))
+
+        results = []
+        for process, shard, results_path, log_path in workers:
+            return_code = process.wait()
+            done = {}
+            if results_path.exists():
+                for line in results_path.read_text().splitlines():
+                    result = json.loads(line)
+                    done[result['source']] = result
+            for job in shard:
+                # A crashed worker leaves the rest of its shard without results
+                results.append(done.get(job.source) or {
+                    'source': job.source, 'output': job.output, 'status': 'failed', 'seconds': 0.0,
+                    'error': f'Worker exited with code {return_code} before converting it, see {log_path}'})
+        return results
+
+
+def print_summary(results: List[dict], wall_seconds: float):
+    for result in sorted(results, key=lambda result: result['seconds'], reverse=True):
+        line = f'{result["status"]:>9} {result["seconds"]:8.2f}s  {result["source"]}'
+        if result.get('error'):
+            line += f'\n{"":>20}{result["error"]}'
+        print(line)
+    statuses = [result['status'] for result in results]
+    converted = [result['seconds'] for result in results if result['status'] == 'converted']
+    print(f'{statuses.count("converted")} converted, {statuses.count("skipped")} skipped, '
+          f'{statuses.count("failed")} failed in {wall_seconds:.1f}s '
+          f'({sum(converted):.1f}s of conversion work)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_dir', type=Path)
+    parser.add_argument('-o', '--output-dir', type=Path, help='Defaults to the input directory')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of Blender workers')
+    parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'),
+                        help='Blender executable, defaults to $BLENDER or blender on PATH')
+    parser.add_argument('--force', action='store_true', help='Convert models whose output is up to date')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--parser', choices=('NATIVE', 'NUMPY'), default='NATIVE')
+    parser.add_argument('--streaming', action='store_true', help='Build one mesh at a time to bound memory use')
+    parser.add_argument('--merge-meshes', choices=('NONE', 'ARMATURE', 'MATERIAL'), default='NONE')
+    parser.add_argument('--color-domain', choices=('CORNER', 'POINT'), default='CORNER')
+    parser.add_argument('--parse-cache', action='store_true', help='Use the on-disk parse cache')
+    args = parser.parse_args()
+
+    blender = shutil.which(args.blender)
+    if blender is None:
+        parser.error(f'Blender executable {args.blender!r} not found, pass --blender or set $BLENDER')
+    input_dir = args.input_dir.absolute()
+    output_dir = (args.output_dir or args.input_dir).absolute()
+    # Every worker parses its own files, more parse processes per worker would only compete for CPUs
+    options = {'scale': args.scale, 'parser': args.parser, 'streaming': args.streaming,
+               'merge_meshes': args.merge_meshes, 'color_domain': args.color_domain,
+               'use_parse_cache': args.parse_cache, 'parse_workers': 1}
+
+    start = time.perf_counter()
+    jobs = discover_jobs(input_dir, output_dir)
+    pending = []
+    results = []
+    for job in jobs:
+        if not args.force and is_up_to_date(Path(job.source), Path(job.output)):
+            results.append({'source': job.source, 'output': job.output, 'status': 'skipped', 'seconds': 0.0,
+                            'error': None})
+        else:
+            pending.append(job)
+    print(f'{len(jobs)} models found, {len(pending)} to convert')
+    if pending:
+        shards = shard_jobs(pending, max(1, args.jobs))
+        results += run_workers(shards, blender, options, output_dir / LOG_DIR_NAME)
+    wall_seconds = time.perf_counter() - start
+
+    print_summary(results, wall_seconds)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / SUMMARY_NAME
+    summary_path.write_text(json.dumps({'wall_seconds': wall_seconds, 'options': options, 'results': results},
+                                       indent=2))
+    print(f'Summary written to {summary_path}')
+    return 1 if any(result['status'] == 'failed' for result in results) else 0
+
+
+def _load_addon():
+    # Registers the add-on from this directory, it does not need to be installed in Blender
+    spec = importlib.util.spec_from_file_location(PACKAGE_NAME, ADDON_DIR / '__init__.py',
+                                                  submodule_search_locations=[ADDON_DIR.as_posix()])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+
+def convert(job: Dict[str, str], options: dict):
+    import bpy
+
+    source = Path(job['source'])
+    output = Path(job['output'])
+    bpy.ops.wm.read_homefile(use_empty=True)
+    bpy.ops.blender_xna.ascii_import(filepath=source.as_posix(), files=[{'name': source.name}], **options)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # Saved under a temporary name first, an interrupted save never looks like an up to date output
+    partial = output.with_suffix('.partial.blend')
+    bpy.ops.wm.save_as_mainfile(filepath=partial.as_posix(), check_existing=False)
+    os.replace(partial, output)
+
+
+def worker_main(shard_path: Path):
+    shard = json.loads(shard_path.read_text())
+    _load_addon()
+    with open(shard['results'], 'a') as results:
+        for job in shard['jobs']:
+            print(f'Converting {job["source"]}', flush=True)
+            start = time.perf_counter()
+            error: Optional[str] = None
+            try:
+                convert(job, shard['options'])
+            except Exception as exc:
+                traceback.print_exc()
+                error = f'{type(exc).__name__}: {exc}'
+            results.write(json.dumps({'source': job['source'], 'output': job['output'],
+                                      'status': 'failed' if error else 'converted',
+                                      'seconds': time.perf_counter() - start, 'error': error}) + '\n')
+            results.flush()
+
+
+if __name__ == '__main__':
+    worker_args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    if worker_args[:1] == ['--worker']:
+        worker_main(Path(worker_args[1]))
+    else:
+        sys.exit(main())
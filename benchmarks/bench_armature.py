@@ -0,0 +1,89 @@
+"""Compare per-bone mathutils armature construction with the batched NumPy builder.
+
+Run with: blender -b --factory-startup --python benchmarks/bench_armature.py -- [bone_count] [file_count]
+"""
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+from mathutils import Matrix, Quaternion, Vector
+
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+from common import import_addon_module  # noqa: E402
+
+ArmatureBatch = import_addon_module('armature_builder').ArmatureBatch
+plan_armature = import_addon_module('import_plan').plan_armature
+BoneData = import_addon_module('model_data').BoneData
+
+
+def make_bones(rng, bone_count):
+    quats = rng.normal(size=(bone_count, 4))
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    bones = []
+    for n in range(bone_count):
+        position = tuple(rng.uniform(-1, 1, 3).tolist())
+        parent_id = int(rng.integers(0, n)) if n else -1
+        quat = tuple(quats[n].tolist())
+        bones.append(BoneData(f'bone_{n}', parent_id, position, quat, quat))
+    return bones
+
+
+def per_bone_armature(name, bones, scale):
+    armature = bpy.data.armatures.new(f"{name}_ARM_DATA")
+    armature_obj = bpy.data.objects.new(f"{name}_ARM", armature)
+    bpy.context.scene.collection.objects.link(armature_obj)
+    armature_obj.select_set(True)
+    bpy.context.view_layer.objects.active = armature_obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    bl_bones = [armature.edit_bones.new(bone.name) for bone in bones]
+    for bone, bl_bone in zip(bones, bl_bones):
+        if bone.parent_id != -1:
+            bl_bone.parent = bl_bones[bone.parent_id]
+        bl_bone.head = Vector(bone.blender_pos) * scale
+        bl_bone.tail = bl_bone.head + Vector([0, 0.05, 0]) * scale
+        quat = Quaternion(bone.blender_quat).to_matrix().to_4x4()
+        bl_bone.matrix = Matrix.Translation(Vector(bone.blender_pos) * scale) @ quat
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return armature_obj
+
+
+def batched_armatures(skeletons, scale):
+    armatures = ArmatureBatch()
+    armature_objs = [armatures.add(f'batch_{n}', plan_armature(bones, scale)) for n, bones in enumerate(skeletons)]
+    armatures.build()
+    return armature_objs
+
+
+def rest_matrices(armature_obj):
+    matrices = np.empty(len(armature_obj.data.bones) * 16, np.float32)
+    armature_obj.data.bones.foreach_get('matrix_local', matrices)
+    return matrices
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    bone_count = int(argv[0]) if len(argv) > 0 else 5000
+    file_count = int(argv[1]) if len(argv) > 1 else 4
+    rng = np.random.default_rng(0)
+    skeletons = [make_bones(rng, bone_count) for _ in range(file_count)]
+
+    start = time.perf_counter()
+    old_objs = [per_bone_armature(f'per_bone_{n}', bones, 2.0) for n, bones in enumerate(skeletons)]
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_objs = batched_armatures(skeletons, 2.0)
+    new_time = time.perf_counter() - start
+
+    print(f'{file_count} armatures x {bone_count} bones')
+    print(f'per bone: {old_time:.3f}s')
+    print(f'batched:  {new_time:.3f}s ({old_time / max(new_time, 1e-9):.1f}x)')
+    for old_obj, new_obj in zip(old_objs, new_objs):
+        assert np.allclose(rest_matrices(old_obj), rest_matrices(new_obj), atol=1e-4), 'Rest matrices differ'
+    print('rest matrices identical')
+
+
+if __name__ == '__main__':
+    main()
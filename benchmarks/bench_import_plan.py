@@ -0,0 +1,134 @@
+"""Headless parse and conversion throughput benchmark, runs with plain Python (no Blender needed).
+
+python benchmarks/bench_import_plan.py --vertices 200000 --meshes 2 --uv-layers 2 --bones 128 --influences 4
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+from common import import_addon_module  # noqa: E402
+from synthetic import make_model_data, write_ascii_model  # noqa: E402
+
+import_plan = import_addon_module('import_plan')
+ascii_parser = import_addon_module('ascii_parser')
+
+
+def measure(fn, *args, **kwargs):
+    """Time one run and trace peak memory in a second one, tracemalloc overhead would skew the timing."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fn(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def report(label, elapsed, peak, vertex_count, extra=''):
+    print(f'{label:<24} {elapsed:8.3f}s {vertex_count / max(elapsed, 1e-9) / 1e6:8.2f} Mvert/s '
+          f'peak {peak / 1024 ** 2:8.1f} MB {extra}')
+
+
+def convert(model, scale):
+    bone_names = [bone.name for bone in model.bones] or None
+    plans = [import_plan.plan_mesh(mesh, scale, bone_names) for mesh in model.meshes]
+    return plans, import_plan.plan_armature(model.bones, scale)
+
+
+def legacy_attributes(model):
+    """Per-loop UVs and colors the way the importer built them before plan_mesh: fancy index plus flatten."""
+    buffers = []
+    for mesh in model.meshes:
+        vertex_indices = np.asarray(mesh.indices, np.uint32).ravel()
+        for uv_layer_data in mesh.uv_layers.values():
+            uv_layer_data = np.array(uv_layer_data, np.float32)
+            uv_layer_data[:, 1] = 1 - uv_layer_data[:, 1]
+            buffers.append(uv_layer_data[vertex_indices].flatten())
+        colors = np.array(mesh.vertex_colors, np.float32)
+        buffers.append(colors[vertex_indices].flatten())
+    return buffers
+
+
+def planned_attributes(model, point_colors):
+    buffers = []
+    for mesh in model.meshes:
+        loop_vertex_indices = np.ascontiguousarray(mesh.indices, np.int32).ravel()
+        for uv_layer_data in mesh.uv_layers.values():
+            buffers.append(import_plan.gather_loop_uvs(uv_layer_data, loop_vertex_indices).ravel())
+        if point_colors:
+            buffers.append(np.ascontiguousarray(mesh.vertex_colors, np.float32).ravel())
+        else:
+            buffers.append(import_plan.gather_loops(mesh.vertex_colors, loop_vertex_indices).ravel())
+    return buffers
+
+
+def native_parser():
+    try:
+        py_xna_lib = import_addon_module('py_xna_lib')
+    except ImportError as ex:
+        print(f'py_xna_lib unavailable, skipping native parser ({ex})')
+        return None
+    model_from_xna = import_addon_module('model_data').model_from_xna
+
+    def parse(path: Path):
+        return model_from_xna(py_xna_lib.parse_ascii_mesh_from_file(path.as_posix(), False))
+
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vertices', type=int, default=200_000, help='Vertices per mesh')
+    parser.add_argument('--meshes', type=int, default=1)
+    parser.add_argument('--uv-layers', type=int, default=1)
+    parser.add_argument('--bones', type=int, default=64)
+    parser.add_argument('--influences', type=int, default=4)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--keep', type=Path, default=None, help='Write the synthetic .ascii here and keep it')
+    args = parser.parse_args()
+    total_vertices = args.vertices * args.meshes
+    size_args = dict(vertex_count=args.vertices, mesh_count=args.meshes, uv_layers=args.uv_layers,
+                     bone_count=args.bones, influences=args.influences)
+    print(f'{args.meshes} x {args.vertices} vertices, {args.uv_layers} UV layers, '
+          f'{args.bones} bones, {args.influences} influences')
+
+    model = make_model_data(**size_args)
+    (plans, armature), elapsed, peak = measure(convert, model, args.scale)
+    buckets = sum(len(plan.weights.buckets) for plan in plans)
+    report('convert (in memory)', elapsed, peak, total_vertices, f'{buckets} weight buckets')
+    del plans
+    _, elapsed, peak = measure(legacy_attributes, model)
+    report('UV/color (index+flatten)', elapsed, peak, total_vertices)
+    _, elapsed, peak = measure(planned_attributes, model, False)
+    report('UV/color (corner)', elapsed, peak, total_vertices)
+    _, elapsed, peak = measure(planned_attributes, model, True)
+    report('UV/color (point colors)', elapsed, peak, total_vertices)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.keep or Path(tmp) / 'synthetic.ascii'
+        start = time.perf_counter()
+        write_ascii_model(path, **size_args)
+        print(f'wrote {path.stat().st_size / 1024 ** 2:.1f} MB in {time.perf_counter() - start:.2f}s')
+
+        model, elapsed, peak = measure(ascii_parser.parse_ascii_mesh, path)
+        report('parse (NumPy streaming)', elapsed, peak, total_vertices)
+        del model
+
+        parse = native_parser()
+        if parse is not None:
+            model, elapsed, peak = measure(parse, path)
+            report('parse (py_xna_lib)', elapsed, peak, total_vertices)
+            _, elapsed, peak = measure(convert, model, args.scale)
+            report('convert (parsed)', elapsed, peak, total_vertices)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compare from_pydata mesh construction with the foreach_set builder, wall time and peak NumPy memory.
+
+Run with: blender -b --factory-startup --python benchmarks/bench_mesh_build.py -- [vertex_count] [uv_layers]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+from common import import_addon_module  # noqa: E402
+
+build_mesh = import_addon_module('mesh_builder').build_mesh
+plan_mesh = import_addon_module('import_plan').plan_mesh
+MeshData = import_addon_module('model_data').MeshData
+
+
+def from_pydata_path(vertices, normals, uv_layers, colors, indices, scale):
+    mesh_data = bpy.data.meshes.new('from_pydata')
+    vertices = np.array(vertices, np.float32)
+    vertices[:, 0], vertices[:, 1], vertices[:, 2] = (
+        vertices[:, 2].copy(), vertices[:, 0].copy(), vertices[:, 1].copy())
+    mesh_data.from_pydata(vertices * scale, [], indices)
+    mesh_data.update()
+    del vertices
+    mesh_data.polygons.foreach_set("use_smooth", np.ones(len(mesh_data.polygons), np.uint32))
+    normals = np.array(normals, np.float32)
+    normals[:, 0], normals[:, 1], normals[:, 2] = (normals[:, 2].copy(),
+                                                   normals[:, 0].copy(),
+                                                   normals[:, 1].copy())
+    mesh_data.normals_split_custom_set_from_vertices(normals * -1)
+    vertex_indices = np.zeros((len(mesh_data.loops, )), dtype=np.uint32)
+    mesh_data.loops.foreach_get('vertex_index', vertex_indices)
+    for uv_layer_id, uv_layer_data in uv_layers.items():
+        uv_data = mesh_data.uv_layers.new(name=f'UV_{uv_layer_id}')
+        uv_layer_data = np.array(uv_layer_data, np.float32)
+        uv_layer_data[:, 1] = 1 - uv_layer_data[:, 1]
+        uv_data.data.foreach_set('uv', uv_layer_data[vertex_indices].flatten())
+    vc = mesh_data.vertex_colors.new()
+    colors = np.array(colors, np.float32)
+    vc.data.foreach_set('color', colors[vertex_indices].flatten())
+    return mesh_data
+
+
+def foreach_set_path(vertices, normals, uv_layers, colors, indices, scale):
+    mesh_data = bpy.data.meshes.new('foreach_set')
+    mesh = MeshData('foreach_set', vertices, normals, colors, uv_layers, indices,
+                    np.zeros((len(vertices), 0), np.int32), np.zeros((len(vertices), 0), np.float32))
+    build_mesh(mesh_data, plan_mesh(mesh, scale))
+    return mesh_data
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    vertex_count = int(argv[0]) if len(argv) > 0 else 500_000
+    uv_layer_count = int(argv[1]) if len(argv) > 1 else 2
+    rng = np.random.default_rng(0)
+    vertices = rng.random((vertex_count, 3), np.float32)
+    normals = rng.random((vertex_count, 3), np.float32)
+    colors = rng.random((vertex_count, 4), np.float32)
+    uv_layers = {i: rng.random((vertex_count, 2), np.float32) for i in range(uv_layer_count)}
+    indices = rng.integers(0, vertex_count, (vertex_count * 2, 3), dtype=np.int32)
+    # Avoid degenerate triangles, Blender would drop them in one path and not the other
+    indices[:, 1] = (indices[:, 0] + 1) % vertex_count
+    indices[:, 2] = (indices[:, 0] + 2) % vertex_count
+
+    old_mesh, old_time, old_peak = measure(from_pydata_path, vertices, normals, uv_layers, colors, indices, 2.0)
+    new_mesh, new_time, new_peak = measure(foreach_set_path, vertices, normals, uv_layers, colors, indices, 2.0)
+
+    print(f'{vertex_count} vertices, {len(indices)} triangles, {uv_layer_count} UV layers')
+    print(f'from_pydata: {old_time:.3f}s, peak {old_peak / 1024 ** 2:.1f} MB')
+    print(f'foreach_set: {new_time:.3f}s, peak {new_peak / 1024 ** 2:.1f} MB '
+          f'({old_time / max(new_time, 1e-9):.1f}x faster)')
+
+    old_co = np.empty(len(old_mesh.vertices) * 3, np.float32)
+    new_co = np.empty(len(new_mesh.vertices) * 3, np.float32)
+    old_mesh.vertices.foreach_get('co', old_co)
+    new_mesh.vertices.foreach_get('co', new_co)
+    assert np.array_equal(old_co, new_co), 'Vertex positions differ'
+    old_loops = np.empty(len(old_mesh.loops), np.int32)
+    new_loops = np.empty(len(new_mesh.loops), np.int32)
+    old_mesh.loops.foreach_get('vertex_index', old_loops)
+    new_mesh.loops.foreach_get('vertex_index', new_loops)
+    assert np.array_equal(old_loops, new_loops), 'Topology differs'
+    print('geometry identical')
+
+
+if __name__ == '__main__':
+    main()
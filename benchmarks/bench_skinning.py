@@ -0,0 +1,79 @@
+"""Compare per-influence VertexGroup.add calls with the bucketed skinning stage.
+
+Run with: blender -b --factory-startup --python benchmarks/bench_skinning.py -- [vertex_count] [bone_count] [decimals]
+
+Weights keep full precision unless decimals is given, rounding them merges buckets and flatters the
+bucketed stage. tests/test_skinning.py checks both stages give the same groups without Blender.
+"""
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+from common import import_addon_module  # noqa: E402
+
+assign_weights = import_addon_module('skinning').assign_weights
+plan_weights = import_addon_module('import_plan').plan_weights
+
+
+def make_object(name, vertex_count):
+    mesh_data = bpy.data.meshes.new(name)
+    mesh_data.vertices.add(vertex_count)
+    return bpy.data.objects.new(name, mesh_data)
+
+
+def per_vertex_weights(mesh_obj, bone_ids, weights, bone_names):
+    weight_groups = {name: mesh_obj.vertex_groups.new(name=name) for name in bone_names}
+    for n, (bone_indices, bone_weights) in enumerate(zip(bone_ids, weights)):
+        for bone_index, weight in zip(bone_indices, bone_weights):
+            if weight > 0:
+                weight_groups[bone_names[bone_index]].add([n], weight, 'REPLACE')
+
+
+def group_snapshot(mesh_obj):
+    result = {}
+    for vertex in mesh_obj.data.vertices:
+        for group in vertex.groups:
+            result[(vertex.index, mesh_obj.vertex_groups[group.group].name)] = group.weight
+    return result
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    vertex_count = int(argv[0]) if len(argv) > 0 else 200_000
+    bone_count = int(argv[1]) if len(argv) > 1 else 64
+    decimals = int(argv[2]) if len(argv) > 2 else None
+    rng = np.random.default_rng(0)
+    bone_ids = rng.integers(0, bone_count, (vertex_count, 4)).tolist()
+    weights = rng.random((vertex_count, 4))
+    if decimals is not None:
+        weights = np.round(weights, decimals)
+    weights[rng.random((vertex_count, 4)) < 0.3] = 0
+    weights = weights.tolist()
+    bone_names = [f'bone_{i}' for i in range(bone_count)]
+
+    old_obj = make_object('per_vertex', vertex_count)
+    start = time.perf_counter()
+    per_vertex_weights(old_obj, bone_ids, weights, bone_names)
+    old_time = time.perf_counter() - start
+
+    new_obj = make_object('bucketed', vertex_count)
+    start = time.perf_counter()
+    plan = plan_weights(bone_ids, weights, bone_names)
+    assign_weights(new_obj, plan)
+    new_time = time.perf_counter() - start
+
+    precision = 'full precision' if decimals is None else f'{decimals} decimals'
+    print(f'{vertex_count} vertices, {bone_count} bones, weights in {precision}, {len(plan.buckets)} buckets')
+    print(f'per vertex: {old_time:.3f}s')
+    print(f'bucketed:   {new_time:.3f}s ({old_time / max(new_time, 1e-9):.1f}x)')
+    if vertex_count <= 50_000:
+        assert group_snapshot(old_obj) == group_snapshot(new_obj), 'Vertex groups differ'
+        print('vertex groups identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Binary (.mesh / .xps) against ASCII parse throughput on the same synthetic model, runs with plain Python.
+
+python benchmarks/bench_xps_binary.py --vertices 200000 --meshes 2 --uv-layers 2 --bones 128
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+from bench_import_plan import measure, native_parser, report  # noqa: E402
+from common import import_addon_module  # noqa: E402
+from synthetic import write_ascii_model, write_xps_model  # noqa: E402
+
+ascii_parser = import_addon_module('ascii_parser')
+xps_binary = import_addon_module('xps_binary')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vertices', type=int, default=200_000, help='Vertices per mesh')
+    parser.add_argument('--meshes', type=int, default=1)
+    parser.add_argument('--uv-layers', type=int, default=1)
+    parser.add_argument('--bones', type=int, default=64)
+    args = parser.parse_args()
+    total_vertices = args.vertices * args.meshes
+    # .mesh files always store 4 influences, keep the ASCII file comparable
+    size_args = dict(vertex_count=args.vertices, mesh_count=args.meshes, uv_layers=args.uv_layers,
+                     bone_count=args.bones, influences=4)
+    print(f'{args.meshes} x {args.vertices} vertices, {args.uv_layers} UV layers, {args.bones} bones')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            'ascii': write_ascii_model(Path(tmp) / 'synthetic.ascii', **size_args),
+            'mesh': write_xps_model(Path(tmp) / 'synthetic.mesh', **size_args),
+            'xps': write_xps_model(Path(tmp) / 'synthetic.xps', xps_header=True, **size_args),
+        }
+        for label, path in paths.items():
+            print(f'{label:<6} {path.stat().st_size / 1024 ** 2:8.1f} MB')
+
+        timings = {}
+        _, timings['ascii'], peak = measure(ascii_parser.parse_ascii_mesh, paths['ascii'])
+        report('parse .ascii (NumPy)', timings['ascii'], peak, total_vertices)
+        parse = native_parser()
+        if parse is not None:
+            _, elapsed, peak = measure(parse, paths['ascii'])
+            report('parse .ascii (py_xna_lib)', elapsed, peak, total_vertices)
+        for label in ('mesh', 'xps'):
+            _, timings[label], peak = measure(xps_binary.parse_xps_binary, paths[label])
+            report(f'parse .{label}', timings[label], peak, total_vertices,
+                   f'{timings["ascii"] / max(timings[label], 1e-9):.1f}x faster than .ascii')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import importlib
+import sys
+import types
+from pathlib import Path
+
+ADDON_DIR = Path(__file__).absolute().parent.parent
+PACKAGE_NAME = 'blender_xna'
+
+
+def import_addon_module(name: str):
+    """Import an add-on submodule without running the add-on __init__ (which registers operators)."""
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [ADDON_DIR.as_posix()]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f'{PACKAGE_NAME}.{name}')
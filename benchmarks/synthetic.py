@@ -0,0 +1,132 @@
+"""Synthetic XNALara ASCII and binary models of configurable size for benchmarks."""
+from pathlib import Path
+
+import numpy as np
+
+from common import import_addon_module
+
+model_data = import_addon_module('model_data')
+xps_binary = import_addon_module('xps_binary')
+
+
+def _random_mesh_arrays(rng, vertex_count, uv_layers, bone_count, influences):
+    face_count = vertex_count * 2
+    vertices = rng.uniform(-1, 1, (vertex_count, 3)).astype(np.float32)
+    normals = rng.normal(size=(vertex_count, 3)).astype(np.float32)
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    colors = rng.integers(0, 256, (vertex_count, 4), dtype=np.int32)
+    uvs = [rng.random((vertex_count, 2), np.float32) for _ in range(uv_layers)]
+    bone_ids = rng.integers(0, max(bone_count, 1), (vertex_count, influences), dtype=np.int32)
+    weights = np.round(rng.dirichlet(np.ones(influences), vertex_count), 3).astype(np.float32)
+    first = rng.integers(0, vertex_count, face_count, dtype=np.int32)
+    indices = np.stack([first, (first + 1) % vertex_count, (first + 2) % vertex_count], axis=1)
+    return vertices, normals, colors, uvs, bone_ids, weights, indices
+
+
+def _random_bones(rng, bone_count):
+    parents = np.array([-1] + [int(rng.integers(0, i)) for i in range(1, bone_count)], np.int32)
+    positions = rng.uniform(-1, 1, (bone_count, 3)).astype(np.float32)
+    return parents, positions
+
+
+def write_ascii_model(path: Path, vertex_count=100_000, mesh_count=1, uv_layers=1, bone_count=64,
+                      influences=4, seed=0) -> Path:
+    """Write a model in the XNALara ASCII layout parsed by py_xna_lib."""
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    parents, positions = _random_bones(rng, bone_count)
+    with path.open('w', encoding='utf8', newline='\n') as file:
+        file.write(f'{bone_count} # bones\n')
+        for n in range(bone_count):
+            file.write(f'bone_{n}\n{parents[n]} # parent index\n')
+            file.write('{:.6f} {:.6f} {:.6f}\n'.format(*positions[n]))
+        file.write(f'{mesh_count} # meshes\n')
+        for mesh_id in range(mesh_count):
+            vertices, normals, colors, uvs, bone_ids, weights, indices = _random_mesh_arrays(
+                rng, vertex_count, uv_layers, bone_count, influences)
+            file.write(f'mesh_{mesh_id}\n{uv_layers} # uv layers\n1 # textures\n')
+            file.write(f'texture_{mesh_id}.png\n0 # uv layer index\n')
+            file.write(f'{vertex_count} # vertices\n')
+            row_format = '%.6f %.6f %.6f\n%.6f %.6f %.6f\n%d %d %d %d\n' + '%.6f %.6f\n' * uv_layers
+            if bone_count:
+                row_format += ' '.join(['%d'] * influences) + '\n' + ' '.join(['%.3f'] * influences) + '\n'
+            columns = [vertices, normals, colors.astype(np.float64), *uvs]
+            if bone_count:
+                columns += [bone_ids, weights]
+            rows = np.concatenate([np.asarray(column, np.float64) for column in columns], axis=1)
+            chunk = 65536
+            for start in range(0, vertex_count, chunk):
+                file.write(''.join(row_format % tuple(row) for row in rows[start:start + chunk].tolist()))
+            file.write(f'{len(indices)} # faces\n')
+            np.savetxt(file, indices, fmt='%d')
+    return path
+
+
+def _xps_string(text: str) -> bytes:
+    data = text.encode('utf8')
+    length = bytes([len(data)]) if len(data) < 128 else bytes([len(data) % 128 + 128, len(data) // 128])
+    return length + data
+
+
+def write_xps_model(path: Path, vertex_count=100_000, mesh_count=1, uv_layers=1, bone_count=64,
+                    influences=4, seed=0, xps_header=False) -> Path:
+    """Write the same model as write_ascii_model in the binary layout.
+
+    Without xps_header this is a .mesh file (tangents, 4 influences per vertex), with it an XPS 3.x
+    file whose vertices store their influence count, which allows other influence counts than 4.
+    """
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    parents, positions = _random_bones(rng, bone_count)
+    if not xps_header and bone_count and influences != 4:
+        raise ValueError('.mesh files store exactly 4 influences per vertex')
+    with path.open('wb') as file:
+        if xps_header:
+            file.write(np.array([xps_binary.XPS_MAGIC], '<u4').tobytes() + np.array([3, 15], '<u2').tobytes())
+            file.write(_xps_string('XNAaral') + np.array([2], '<u4').tobytes())
+            file.write(_xps_string('machine') + _xps_string('user') + _xps_string('files'))
+            # Settings: hash and an empty option list
+            file.write(np.array([0, 0], '<u4').tobytes())
+        file.write(np.array([bone_count], '<u4').tobytes())
+        for n in range(bone_count):
+            file.write(_xps_string(f'bone_{n}') + np.array([parents[n]], '<i2').tobytes())
+            file.write(positions[n].astype('<f4').tobytes())
+        file.write(np.array([mesh_count], '<u4').tobytes())
+        for mesh_id in range(mesh_count):
+            vertices, normals, colors, uvs, bone_ids, weights, indices = _random_mesh_arrays(
+                rng, vertex_count, uv_layers, bone_count, influences)
+            file.write(_xps_string(f'mesh_{mesh_id}') + np.array([uv_layers, 1], '<u4').tobytes())
+            file.write(_xps_string(f'texture_{mesh_id}.png') + np.array([0, vertex_count], '<u4').tobytes())
+            dtype = xps_binary.vertex_dtype(uv_layers, not xps_header, influences if bone_count else 0,
+                                            xps_header and bool(bone_count))
+            records = np.zeros(vertex_count, dtype)
+            records['position'] = vertices
+            records['normal'] = normals
+            records['color'] = colors
+            for n, uv in enumerate(uvs):
+                records[f'uv{n}'] = uv
+            if bone_count:
+                if xps_header:
+                    records['influence_count'] = influences
+                records['bone_ids'] = bone_ids
+                records['weights'] = weights
+            file.write(records.tobytes())
+            file.write(np.array([len(indices)], '<u4').tobytes() + indices.astype('<u4').tobytes())
+    return path
+
+
+def make_model_data(vertex_count=100_000, mesh_count=1, uv_layers=1, bone_count=64, influences=4, seed=0):
+    """Build equivalent ModelData in memory, for conversion benchmarks that should not depend on the parser."""
+    rng = np.random.default_rng(seed)
+    parents, positions = _random_bones(rng, bone_count)
+    bones = [model_data.BoneData(f'bone_{n}', int(parents[n]), tuple(positions[n][[2, 0, 1]].tolist()))
+             for n in range(bone_count)]
+    meshes = []
+    for mesh_id in range(mesh_count):
+        vertices, normals, colors, uvs, bone_ids, weights, indices = _random_mesh_arrays(
+            rng, vertex_count, uv_layers, bone_count, influences)
+        material = model_data.MaterialData(f'mesh_{mesh_id}', {'Diffuse': (f'texture_{mesh_id}.png', 0)})
+        meshes.append(model_data.MeshData(f'mesh_{mesh_id}', vertices, normals,
+                                          (colors / 255).astype(np.float32),
+                                          dict(enumerate(uvs)), indices, bone_ids, weights, material))
+    return model_data.ModelData(bones, meshes)
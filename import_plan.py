@@ -0,0 +1,294 @@
+"""Blender independent conversion of parsed XNA models into ready to upload buffers.
+
+Nothing here imports bpy, so the conversion can be profiled and benchmarked with plain Python.
+"""
+import gc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .model_data import BoneData, MaterialData, MeshData, widen_influences
+
+
+@dataclass
+class WeightPlan:
+    # Vertex groups to create, in order. Duplicated names are kept, Blender renames them
+    group_names: List[str]
+    # (group name, weight, vertex indices), one VertexGroup.add call each
+    buckets: List[Tuple[str, float, List[int]]]
+
+
+@dataclass
+class MeshPlan:
+    name: str
+    positions: np.ndarray
+    loop_vertex_indices: np.ndarray
+    normals: np.ndarray
+    loop_uvs: Dict[int, np.ndarray]
+    # Per-vertex colors for the POINT domain, per-loop colors for CORNER
+    colors: np.ndarray
+    weights: WeightPlan
+    material: Optional[MaterialData] = None
+    color_domain: str = 'CORNER'
+    # Set on merged meshes: one material slot per entry and the slot of every face
+    materials: List[MaterialData] = field(default_factory=list)
+    face_material_ids: Optional[np.ndarray] = None
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def face_count(self):
+        return len(self.loop_vertex_indices) // 3
+
+
+@dataclass
+class ArmaturePlan:
+    names: List[str]
+    parent_ids: np.ndarray
+    heads: np.ndarray
+    tails: np.ndarray
+    # Row-major 4x4 rest matrices, only meaningful where has_rotation is set
+    matrices: np.ndarray
+    has_rotation: np.ndarray = field(default_factory=lambda: np.zeros(0, np.bool_))
+
+
+def to_blender_axes(array: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """Swizzle XNA (x, y, z) into Blender (z, x, y) and scale, in a single pass into a new float32 buffer."""
+    array = np.asarray(array)
+    result = np.empty((len(array), 3), np.float32)
+    np.multiply(array[:, 2], scale, out=result[:, 0], casting='unsafe')
+    np.multiply(array[:, 0], scale, out=result[:, 1], casting='unsafe')
+    np.multiply(array[:, 1], scale, out=result[:, 2], casting='unsafe')
+    return result
+
+
+def gather_loops(per_vertex: np.ndarray, loop_vertex_indices: np.ndarray) -> np.ndarray:
+    """Expand per-vertex data to per-loop data with one gather into a contiguous float32 buffer.
+
+    Indices are expected in range (see check_loop_indices), mode='raise' would make take() buffer the output.
+    """
+    per_vertex = np.asarray(per_vertex, np.float32)
+    result = np.empty((len(loop_vertex_indices), per_vertex.shape[1]), np.float32)
+    np.take(per_vertex, loop_vertex_indices, axis=0, out=result, mode='clip')
+    return result
+
+
+def check_loop_indices(loop_vertex_indices: np.ndarray, vertex_count: int):
+    if len(loop_vertex_indices) and not 0 <= loop_vertex_indices.min() <= loop_vertex_indices.max() < vertex_count:
+        raise IndexError(f'Face indices out of range for {vertex_count} vertices')
+
+
+def gather_loop_uvs(uv: np.ndarray, loop_vertex_indices: np.ndarray) -> np.ndarray:
+    """Per-loop UVs with V flipped in place in the gathered buffer, so no per-vertex copy is made."""
+    result = gather_loops(uv, loop_vertex_indices)
+    np.subtract(1, result[:, 1], out=result[:, 1])
+    return result
+
+
+def flatten_influences(bone_ids, weights):
+    """Turn per-vertex influence lists into flat (vertex, bone, weight) arrays."""
+    try:
+        np_bone_ids = np.asarray(bone_ids, np.int32)
+        np_weights = np.asarray(weights, np.float32)
+    except ValueError:
+        np_bone_ids = np_weights = None
+    if np_bone_ids is not None and np_bone_ids.ndim == 2 and np_bone_ids.shape == np_weights.shape:
+        vertex_ids = np.repeat(np.arange(np_bone_ids.shape[0], dtype=np.int32), np_bone_ids.shape[1])
+        return vertex_ids, np_bone_ids.ravel(), np_weights.ravel()
+
+    # Ragged influence lists, mirror zip() semantics and truncate to the shorter list
+    counts = np.fromiter((min(len(ids), len(wts)) for ids, wts in zip(bone_ids, weights)), np.int32)
+    vertex_ids = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    flat_ids = np.fromiter((i for ids, c in zip(bone_ids, counts) for i in ids[:c]), np.int32, counts.sum())
+    flat_weights = np.fromiter((w for wts, c in zip(weights, counts) for w in wts[:c]), np.float32, counts.sum())
+    return vertex_ids, flat_ids, flat_weights
+
+
+def bucket_weights(vertex_ids: np.ndarray, bone_ids: np.ndarray, weights: np.ndarray):
+    """Group non-zero influences by (bone, weight).
+
+    Yields (bone_index, weight, vertex_indices) tuples. When a vertex references the same bone
+    more than once the last influence wins, same as repeated VertexGroup.add(..., 'REPLACE') calls.
+    """
+    mask = weights > 0
+    vertex_ids, bone_ids, weights = vertex_ids[mask], bone_ids[mask], weights[mask]
+    if not len(weights):
+        return
+
+    # Drop duplicated (vertex, bone) pairs keeping the last one
+    keys = vertex_ids.astype(np.int64) << 32 | bone_ids.astype(np.int64) & 0xFFFFFFFF
+    _, last = np.unique(keys[::-1], return_index=True)
+    keep = np.sort(len(keys) - 1 - last)
+    vertex_ids, bone_ids, weights = vertex_ids[keep], bone_ids[keep], weights[keep]
+
+    order = np.lexsort((vertex_ids, weights, bone_ids))
+    vertex_ids, bone_ids, weights = vertex_ids[order], bone_ids[order], weights[order]
+    splits = np.flatnonzero((bone_ids[1:] != bone_ids[:-1]) | (weights[1:] != weights[:-1])) + 1
+    starts = np.concatenate(([0], splits))
+    ends = np.concatenate((splits, [len(weights)]))
+    # Unquantized weights give close to one bucket per influence, so no NumPy scalars per bucket
+    vertex_list = vertex_ids.tolist()
+    for bone, weight, start, end in zip(bone_ids[starts].tolist(), weights[starts].tolist(),
+                                        starts.tolist(), ends.tolist()):
+        yield bone, weight, vertex_list[start:end]
+
+
+def plan_weights(bone_ids, weights, bone_names: Optional[List[str]] = None) -> WeightPlan:
+    """Plan vertex groups and their bulk weight assignments.
+
+    With bone_names a group is created for every bone, in order, and looked up by name.
+    Without them a group named after each referenced bone index is created instead.
+    """
+    vertex_ids, flat_bone_ids, flat_weights = flatten_influences(bone_ids, weights)
+    if bone_names is not None:
+        group_names = list(bone_names)
+        # Bones sharing a name share a group, so bucket by group rather than by bone
+        slot_names = list(dict.fromkeys(bone_names))
+        name_to_slot = {name: i for i, name in enumerate(slot_names)}
+        bone_to_slot = np.array([name_to_slot[name] for name in bone_names], np.int32)
+        flat_bone_ids = bone_to_slot[flat_bone_ids]
+    else:
+        group_names = [str(bone) for bone in set(flat_bone_ids.tolist())]
+        slot_names = None
+
+    if slot_names is None:
+        slot_names = {int(bone): name for bone, name in zip(group_names, group_names)}
+    # Unquantized weights make hundreds of thousands of small lists, which would set off the cyclic
+    # garbage collector over and over. None of them can be part of a cycle
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        buckets = [(slot_names[slot], weight, vertices)
+                   for slot, weight, vertices in bucket_weights(vertex_ids, flat_bone_ids, flat_weights)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return WeightPlan(group_names, buckets)
+
+
+def estimate_mesh_bytes(mesh, point_colors: bool = False) -> int:
+    """Approximate memory needed to hold a parsed mesh and its plan at the same time."""
+    vertex_count = len(mesh.vertices)
+    loop_count = np.size(mesh.indices)
+    parsed = sum(np.asarray(array).nbytes for array in
+                 (mesh.vertices, mesh.normals, mesh.vertex_colors, mesh.indices, mesh.bone_ids, mesh.weights))
+    parsed += sum(np.asarray(uv).nbytes for uv in mesh.uv_layers.values())
+    # Positions, normals, per-loop UVs and colors in float32, plus the weight buckets
+    color_bytes = vertex_count * 16 if point_colors else loop_count * 16
+    planned = vertex_count * 24 + loop_count * 8 * len(mesh.uv_layers) + color_bytes + np.size(mesh.weights) * 12
+    return parsed + planned
+
+
+def plan_mesh(mesh, scale: float = 1.0, bone_names: Optional[List[str]] = None,
+              point_colors: bool = False) -> MeshPlan:
+    """Convert a parsed mesh into upload ready buffers.
+
+    With point_colors vertex colors stay per-vertex for a POINT domain color attribute,
+    otherwise they are expanded to loops like UVs, which Blender always stores per loop.
+    """
+    loop_vertex_indices = np.ascontiguousarray(mesh.indices, np.int32).ravel()
+    check_loop_indices(loop_vertex_indices, len(mesh.vertices))
+    if point_colors:
+        colors = np.ascontiguousarray(mesh.vertex_colors, np.float32)
+    else:
+        colors = gather_loops(mesh.vertex_colors, loop_vertex_indices)
+    return MeshPlan(
+        mesh.name,
+        to_blender_axes(mesh.vertices, scale),
+        loop_vertex_indices,
+        to_blender_axes(mesh.normals, -1),
+        {uv_id: gather_loop_uvs(uv_data, loop_vertex_indices) for uv_id, uv_data in mesh.uv_layers.items()},
+        colors,
+        plan_weights(mesh.bone_ids, mesh.weights, bone_names),
+        mesh.material,
+        'POINT' if point_colors else 'CORNER',
+    )
+
+
+def merge_meshes(name: str, meshes: List[MeshData]) -> MeshData:
+    """Concatenate submeshes into one, offsetting face indices by the vertices that come before them.
+
+    UV layers missing from a submesh are zero filled, influence lists are padded with zero weights.
+    """
+    vertex_counts = np.array([len(mesh.vertices) for mesh in meshes], np.int64)
+    offsets = np.concatenate(([0], np.cumsum(vertex_counts)[:-1]))
+    if vertex_counts.sum() > np.iinfo(np.int32).max:
+        raise ValueError(f'{name} would have more vertices than a mesh can index')
+    indices = np.concatenate([np.asarray(mesh.indices, np.int32).reshape((-1, 3)) + np.int32(offset)
+                              for mesh, offset in zip(meshes, offsets)])
+
+    uv_layer_ids = sorted({uv_id for mesh in meshes for uv_id in mesh.uv_layers})
+    uv_layers = {}
+    for uv_id in uv_layer_ids:
+        uv_layers[uv_id] = np.concatenate([np.asarray(mesh.uv_layers[uv_id], np.float32) if uv_id in mesh.uv_layers
+                                           else np.zeros((len(mesh.vertices), 2), np.float32) for mesh in meshes])
+
+    influences = [(mesh.bone_ids, mesh.weights) if np.ndim(mesh.bone_ids) == 2
+                  else (np.zeros((len(mesh.vertices), 0), np.int32), np.zeros((len(mesh.vertices), 0), np.float32))
+                  for mesh in meshes]
+    width = max(np.shape(mesh_bone_ids)[1] for mesh_bone_ids, _ in influences)
+    widened = [widen_influences(mesh_bone_ids, mesh_weights, width) for mesh_bone_ids, mesh_weights in influences]
+    bone_ids = np.concatenate([mesh_bone_ids for mesh_bone_ids, _ in widened])
+    weights = np.concatenate([mesh_weights for _, mesh_weights in widened])
+
+    return MeshData(name,
+                    np.concatenate([np.asarray(mesh.vertices, np.float32) for mesh in meshes]),
+                    np.concatenate([np.asarray(mesh.normals, np.float32) for mesh in meshes]),
+                    np.concatenate([np.asarray(mesh.vertex_colors, np.float32) for mesh in meshes]),
+                    uv_layers, indices, bone_ids, weights)
+
+
+def plan_merged_mesh(name: str, meshes: List[MeshData], materials: List[Optional[MaterialData]],
+                     scale: float = 1.0, bone_names: Optional[List[str]] = None,
+                     point_colors: bool = False) -> MeshPlan:
+    """Plan several submeshes as one mesh, materials[n] being the material of meshes[n]."""
+    plan = plan_mesh(merge_meshes(name, meshes), scale, bone_names, point_colors)
+    slots = {}
+    for material in materials:
+        if material is not None and material.name not in slots:
+            slots[material.name] = len(plan.materials)
+            plan.materials.append(material)
+    # Faces of submeshes without a material keep the first slot
+    mesh_slots = np.array([slots[material.name] if material is not None else 0 for material in materials], np.int32)
+    plan.face_material_ids = np.repeat(mesh_slots, [len(mesh.indices) for mesh in meshes])
+    return plan
+
+
+def quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """(N, 4) w, x, y, z quaternions to (N, 3, 3) rotation matrices, normalized like mathutils does."""
+    q = np.asarray(quaternions, np.float64).reshape((-1, 4))
+    norm = np.linalg.norm(q, axis=1, keepdims=True)
+    q = np.divide(q, norm, out=np.tile(np.array([1.0, 0, 0, 0]), (len(q), 1)), where=norm > 0)
+    w, x, y, z = q.T
+    matrices = np.empty((len(q), 3, 3), np.float64)
+    matrices[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    matrices[:, 0, 1] = 2 * (x * y - w * z)
+    matrices[:, 0, 2] = 2 * (x * z + w * y)
+    matrices[:, 1, 0] = 2 * (x * y + w * z)
+    matrices[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    matrices[:, 1, 2] = 2 * (y * z - w * x)
+    matrices[:, 2, 0] = 2 * (x * z - w * y)
+    matrices[:, 2, 1] = 2 * (y * z + w * x)
+    matrices[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return matrices
+
+
+def plan_armature(bones: List[BoneData], scale: float = 1.0) -> ArmaturePlan:
+    """Rest pose of every bone in one batch: scaled heads, tails along +Y and 4x4 rest matrices."""
+    bone_count = len(bones)
+    positions = np.asarray([bone.blender_pos for bone in bones], np.float64).reshape((bone_count, 3))
+    has_rotation = np.asarray([bool(bone.quat) for bone in bones], np.bool_)
+    quaternions = np.asarray([bone.blender_quat if bone.quat else (1, 0, 0, 0) for bone in bones],
+                             np.float64).reshape((bone_count, 4))
+
+    heads = positions * scale
+    tails = heads + np.array([0, 0.05, 0]) * scale
+    matrices = np.tile(np.eye(4), (bone_count, 1, 1))
+    matrices[:, :3, :3] = quaternions_to_matrices(quaternions)
+    matrices[:, :3, 3] = heads
+    return ArmaturePlan([bone.name for bone in bones],
+                        np.asarray([bone.parent_id for bone in bones], np.int32),
+                        heads, tails, matrices, has_rotation)
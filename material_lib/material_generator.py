@@ -1,12 +1,18 @@
+import hashlib
+import os
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
 from ..py_xna_lib import Material
 from .shader_base import *
 
+TEXTURE_EXTENSIONS = ['.png', '.tga', '.dds', '.jpg', '.jpeg', '.bmp']
+
 
 def try_find_texture(root_path: Path, texture_name, last=False):
     try:
         for file in root_path.glob(f'{Path(texture_name).stem}.*'):
-            if file.suffix in ['.png', '.tga', '.dds', '.jpg', '.jpeg', '.bmp']:
+            if file.suffix in TEXTURE_EXTENSIONS:
                 return file
     except StopIteration:
         return None
@@ -14,7 +20,59 @@ def try_find_texture(root_path: Path, texture_name, last=False):
         return try_find_texture(root_path / 'textures', texture_name, True)
 
 
-def generate_material(material: Material, root_dir: Path):
+class TextureIndex:
+    """Case-insensitive stem -> path index of texture files, built once per directory.
+
+    Replaces a glob per texture lookup with one directory scan. A directory is rescanned
+    only when its mtime changes. When several files share a stem the extension that comes
+    first in TEXTURE_EXTENSIONS wins.
+    """
+
+    def __init__(self):
+        self._directories: Dict[Path, Tuple[int, Dict[str, Path]]] = {}
+
+    def _get_directory_index(self, directory: Path) -> Dict[str, Path]:
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._directories.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        ranked: Dict[str, Tuple[int, Path]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                ext = ext.lower()
+                if ext not in TEXTURE_EXTENSIONS or not entry.is_file():
+                    continue
+                rank = TEXTURE_EXTENSIONS.index(ext)
+                key = stem.lower()
+                if key not in ranked or rank < ranked[key][0]:
+                    ranked[key] = rank, Path(entry.path)
+        index = {key: path for key, (_, path) in ranked.items()}
+        self._directories[directory] = mtime, index
+        return index
+
+    def find(self, root_path: Path, texture_name: str) -> Optional[Path]:
+        stem = Path(texture_name).stem.lower()
+        for directory in (root_path, root_path / 'textures'):
+            texture_path = self._get_directory_index(directory).get(stem)
+            if texture_path is not None:
+                return texture_path
+        return None
+
+
+def generate_material(material: Material, root_dir: Path, texture_index: Optional[TextureIndex] = None,
+                      image_cache: Optional[ImageCache] = None):
+    if texture_index is not None:
+        def find_texture(texture_name):
+            return texture_index.find(root_dir, texture_name)
+    else:
+        def find_texture(texture_name):
+            return try_find_texture(root_dir, texture_name)
+
     bmat = create_nodes(material.name)
     clean_nodes(bmat)
     diffuse = create_node(bmat, Nodes.ShaderNodeBsdfDiffuse)
@@ -30,15 +88,15 @@ def generate_material(material: Material, root_dir: Path):
 
     if texture := material.textures.get("Diffuse"):
         texture, uv_layer = texture
-        texture_path = try_find_texture(root_dir, texture)
+        texture_path = find_texture(texture)
         if texture_path is not None:
-            tex_node = create_texture_node(bmat, create_texture(texture_path))
+            tex_node = create_texture_node(bmat, create_texture(texture_path, image_cache))
             connect_nodes(bmat, tex_node.outputs['Color'], diffuse.inputs['Color'])
     if texture := material.textures.get("Normal"):
         texture, uv_layer = texture
-        texture_path = try_find_texture(root_dir, texture)
+        texture_path = find_texture(texture)
         if texture_path is not None:
-            tex_node = create_texture_node(bmat, create_texture(texture_path))
+            tex_node = create_texture_node(bmat, create_texture(texture_path, image_cache))
             tex_node.image.colorspace_settings.is_data = True
             tex_node.image.colorspace_settings.name = 'Non-Color'
             normalmap_node = create_node(bmat, Nodes.ShaderNodeNormalMap)
@@ -50,7 +108,48 @@ def generate_material(material: Material, root_dir: Path):
 
     if texture := material.textures.get("Specular"):
         texture, uv_layer = texture
-        texture_path = try_find_texture(root_dir, texture)
+        texture_path = find_texture(texture)
         if texture_path is not None:
-            tex_node = create_texture_node(bmat, create_texture(texture_path))
+            tex_node = create_texture_node(bmat, create_texture(texture_path, image_cache))
             connect_nodes(bmat, tex_node.outputs['Color'], gloss.inputs['Color'])
+    return bmat
+
+
+class MaterialCache:
+    """Builds every material node tree at most once per import session.
+
+    Materials are keyed by name plus a hash of their texture set, including resolved texture
+    paths and mtimes. The hash is stored on the material, so materials left unchanged since
+    a previous import are not rebuilt either.
+    """
+
+    def __init__(self, root_dir: Path, texture_index: Optional[TextureIndex] = None,
+                 image_cache: Optional[ImageCache] = None):
+        self.root_dir = root_dir
+        self.texture_index = texture_index or TextureIndex()
+        self.image_cache = image_cache or ImageCache()
+        self._built: Dict[str, str] = {}
+        self.built = 0
+        self.skipped = 0
+
+    def material_hash(self, material: Material):
+        hasher = hashlib.sha1(material.name.encode('utf8'))
+        for texture_type, (texture, uv_layer) in sorted(material.textures.items()):
+            texture_path = self.texture_index.find(self.root_dir, texture)
+            mtime = texture_path.stat().st_mtime_ns if texture_path is not None else 0
+            hasher.update(f'|{texture_type}|{texture}|{uv_layer}|{texture_path}|{mtime}'.encode('utf8'))
+        return hasher.hexdigest()
+
+    def build(self, material: Material):
+        material_hash = self.material_hash(material)
+        if self._built.get(material.name) == material_hash:
+            self.skipped += 1
+            return
+        bmat = bpy.data.materials.get(material.name, None)
+        if bmat is not None and bmat.get('ASCII_LOADED', False) and bmat.get('ASCII_HASH', None) == material_hash:
+            self.skipped += 1
+        else:
+            bmat = generate_material(material, self.root_dir, self.texture_index, self.image_cache)
+            bmat['ASCII_HASH'] = material_hash
+            self.built += 1
+        self._built[material.name] = material_hash
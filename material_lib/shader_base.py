@@ -1,9 +1,14 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import bpy
 import numpy as np
 
+from ..profiler import phase
+
 
 class Nodes:
     ShaderNodeAddShader = 'ShaderNodeAddShader'
@@ -113,22 +118,154 @@ def ensure_length(array: list, length, filler):
     return array
 
 
-def create_texture(texture_path: Path):
+def _image_key(path: str):
+    return os.path.normcase(os.path.realpath(path))
+
+
+class ImageCache:
+    """Per-session map of resolved texture path -> image datablock.
+
+    Images already present in bpy.data.images are reused by filepath, so one texture file
+    produces exactly one image no matter how many materials reference it.
+    """
+
+    def __init__(self):
+        self._images: Optional[Dict[str, bpy.types.Image]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _collect_existing(self):
+        self._images = {}
+        for image in bpy.data.images:
+            if image.source == 'FILE' and image.filepath:
+                self._images.setdefault(_image_key(bpy.path.abspath(image.filepath, library=image.library)), image)
+
+    def load(self, texture_path: Path):
+        if self._images is None:
+            self._collect_existing()
+        key = _image_key(texture_path.as_posix())
+        image = self._images.get(key)
+        if image is not None:
+            try:
+                image.name
+            except ReferenceError:
+                # Removed since it was cached
+                image = None
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        image = self._load_image(texture_path)
+        self._images[key] = image
+        return image
+
+    def _load_image(self, texture_path: Path):
+        with phase('textures'):
+            return bpy.data.images.load(texture_path.as_posix(), check_existing=True)
+
+
+def _read_texture_file(texture_path: Path, chunk_size: int = 1024 ** 2) -> int:
+    # Only warms the OS file cache, so the main thread load does not wait on the disk
+    size = 0
+    with texture_path.open('rb') as file:
+        while chunk := file.read(chunk_size):
+            size += len(chunk)
+    return size
+
+
+class DeferredImageCache(ImageCache):
+    """ImageCache that hands out placeholder images and swaps the real textures in later.
+
+    Texture files are read by a thread pool while the import goes on. bpy data can only be touched
+    from the main thread, so a bpy.app.timers callback loads the images that are ready, a few
+    milliseconds per tick, and remaps every user of the placeholder to the real image.
+    """
+    POLL_INTERVAL = 0.1
+    TIME_SLICE = 0.02
+
+    def __init__(self, workers: int = 4):
+        super().__init__()
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # (image key, placeholder image, texture path, read future)
+        self._pending: List[Tuple[str, bpy.types.Image, Path, Future]] = []
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def _load_image(self, texture_path: Path):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='blender_xna_textures')
+        if not self._pending:
+            bpy.app.timers.register(self._swap_ready, first_interval=self.POLL_INTERVAL)
+        # Always a new image, one found by name could be the user's or belong to another import
+        placeholder = new_filled_image(f'{texture_path.name} (loading)', (0.5, 0.5, 0.5, 1.0), size=8)
+        future = self._executor.submit(_read_texture_file, texture_path)
+        self._pending.append((_image_key(texture_path.as_posix()), placeholder, texture_path, future))
+        return placeholder
+
+    def _swap(self, key: str, placeholder: bpy.types.Image, texture_path: Path, future: Future,
+              live_images: Set[int]):
+        if placeholder.as_pointer() not in live_images:
+            # Removed by the user or undone, nothing to swap
+            return
+        if future.exception() is not None:
+            print(f'Failed to read texture {texture_path}: {future.exception()}')
+            return
+        image = bpy.data.images.load(texture_path.as_posix(), check_existing=True)
+        image.colorspace_settings.name = placeholder.colorspace_settings.name
+        image.colorspace_settings.is_data = placeholder.colorspace_settings.is_data
+        placeholder.user_remap(image)
+        bpy.data.images.remove(placeholder)
+        self._images[key] = image
+
+    def _swap_ready(self):
+        deadline = time.perf_counter() + self.TIME_SLICE
+        still_pending = []
+        # Pointers of the images that still exist, a removed placeholder must not be touched
+        live_images = {image.as_pointer() for image in bpy.data.images}
+        for entry in self._pending:
+            if entry[3].done() and time.perf_counter() < deadline:
+                self._swap(*entry, live_images)
+            else:
+                still_pending.append(entry)
+        swapped = len(self._pending) - len(still_pending)
+        self._pending = still_pending
+        if swapped:
+            for window in bpy.context.window_manager.windows:
+                for area in window.screen.areas:
+                    if area.type in {'VIEW_3D', 'NODE_EDITOR', 'IMAGE_EDITOR'}:
+                        area.tag_redraw()
+        if self._pending:
+            return self.POLL_INTERVAL
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        return None
+
+
+def create_texture(texture_path: Path, image_cache: Optional[ImageCache] = None):
+    if image_cache is not None:
+        return image_cache.load(texture_path)
     return bpy.data.images.load(texture_path.as_posix())
 
 
-def get_missing_texture(texture_name: str, fill_color: tuple = (1.0, 1.0, 1.0, 1.0)):
+def get_missing_texture(texture_name: str, fill_color: tuple = (1.0, 1.0, 1.0, 1.0), size: int = 512):
     assert len(fill_color) == 4, 'Fill color should be in RGBA format'
     if bpy.data.images.get(texture_name, None):
         return bpy.data.images.get(texture_name)
     else:
-        image = bpy.data.images.new(texture_name, width=512, height=512, alpha=False)
-        image_data = np.full((512 * 512, 4), fill_color, np.float32).flatten()
-        if bpy.app.version > (2, 83, 0):
-            image.pixels.foreach_set(image_data)
-        else:
-            image.pixels[:] = image_data
-        return image
+        return new_filled_image(texture_name, fill_color, size)
+
+
+def new_filled_image(texture_name: str, fill_color: tuple, size: int):
+    image = bpy.data.images.new(texture_name, width=size, height=size, alpha=False)
+    image_data = np.full((size * size, 4), fill_color, np.float32).flatten()
+    if bpy.app.version > (2, 83, 0):
+        image.pixels.foreach_set(image_data)
+    else:
+        image.pixels[:] = image_data
+    return image
 
 
 def make_texture(texture_name, texture_dimm, texture_data, raw_texture=False):
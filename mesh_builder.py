@@ -0,0 +1,44 @@
+import bpy
+import numpy as np
+
+from .import_plan import MeshPlan
+from .profiler import count, phase
+
+
+def build_mesh_geometry(mesh_data, positions: np.ndarray, loop_vertex_indices: np.ndarray):
+    """Fill an empty mesh with triangles using foreach_set on flat buffers."""
+    face_count = len(loop_vertex_indices) // 3
+
+    mesh_data.vertices.add(len(positions))
+    mesh_data.vertices.foreach_set('co', np.ascontiguousarray(positions, np.float32).ravel())
+    mesh_data.loops.add(len(loop_vertex_indices))
+    mesh_data.loops.foreach_set('vertex_index', np.ascontiguousarray(loop_vertex_indices, np.int32))
+    mesh_data.polygons.add(face_count)
+    mesh_data.polygons.foreach_set('loop_start', np.arange(0, face_count * 3, 3, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        mesh_data.polygons.foreach_set('loop_total', np.full(face_count, 3, np.int32))
+    mesh_data.polygons.foreach_set('use_smooth', np.ones(face_count, np.bool_))
+    mesh_data.update(calc_edges=True)
+    count('rna_bulk_calls', 6)
+
+
+def build_mesh(mesh_data, plan: MeshPlan):
+    """Upload geometry, custom normals, UV layers and vertex colors of a planned mesh."""
+    with phase('mesh'):
+        build_mesh_geometry(mesh_data, plan.positions, plan.loop_vertex_indices)
+    with phase('normals'):
+        mesh_data.normals_split_custom_set_from_vertices(plan.normals)
+        mesh_data.use_auto_smooth = True
+        count('rna_bulk_calls')
+    with phase('uv_colors'):
+        for uv_layer_id, loop_uvs in plan.loop_uvs.items():
+            uv_data = mesh_data.uv_layers.new(name=f'UV_{uv_layer_id}')
+            uv_data.data.foreach_set('uv', loop_uvs.ravel())
+        if plan.color_domain == 'POINT':
+            # mesh.attributes rather than color_attributes, which needs Blender 3.2
+            color_attribute = mesh_data.attributes.new(name='Col', type='FLOAT_COLOR', domain='POINT')
+            color_attribute.data.foreach_set('color', plan.colors.ravel())
+        else:
+            vc = mesh_data.vertex_colors.new()
+            vc.data.foreach_set('color', plan.colors.ravel())
+        count('rna_bulk_calls', len(plan.loop_uvs) + 1)
@@ -0,0 +1,198 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class BoneData:
+    name: str
+    parent_id: int
+    blender_pos: Tuple[float, float, float]
+    quat: Optional[Tuple[float, float, float, float]] = None
+    blender_quat: Optional[Tuple[float, float, float, float]] = None
+
+
+@dataclass
+class MaterialData:
+    name: str
+    textures: Dict[str, Tuple[str, int]] = field(default_factory=dict)
+
+
+@dataclass
+class MeshData:
+    name: str
+    vertices: np.ndarray
+    normals: np.ndarray
+    vertex_colors: np.ndarray
+    uv_layers: Dict[int, np.ndarray]
+    indices: np.ndarray
+    bone_ids: np.ndarray
+    weights: np.ndarray
+    material: Optional[MaterialData] = None
+
+
+@dataclass
+class ModelData:
+    bones: List[BoneData]
+    meshes: List[MeshData]
+
+
+def skeleton_hash(bones: List[BoneData]) -> str:
+    """Content hash of bone names, parents and rest transforms."""
+    hasher = hashlib.sha1()
+    for bone in bones:
+        hasher.update(f'{bone.name}|{bone.parent_id}|'.encode('utf8'))
+        hasher.update(np.asarray(bone.blender_pos, np.float32).tobytes())
+        if bone.quat:
+            hasher.update(np.asarray(bone.blender_quat, np.float32).tobytes())
+        hasher.update(b';')
+    return hasher.hexdigest()
+
+
+def mesh_hash(mesh: MeshData, *settings) -> str:
+    """Content hash of a submesh: its arrays, material, and any import settings that change the result."""
+    hasher = hashlib.sha1(f'{mesh.name}|{settings!r}|'.encode('utf8'))
+    arrays = [mesh.vertices, mesh.normals, mesh.vertex_colors, mesh.indices, mesh.bone_ids, mesh.weights]
+    arrays += [mesh.uv_layers[uv_id] for uv_id in sorted(mesh.uv_layers)]
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        hasher.update(f'{array.dtype.str}{array.shape};'.encode('utf8'))
+        hasher.update(array.reshape(-1).view(np.uint8))
+    if mesh.material is not None:
+        hasher.update(f'{mesh.material.name}|{sorted(mesh.material.textures.items())!r}'.encode('utf8'))
+    return hasher.hexdigest()
+
+
+def material_from_xna(material) -> Optional[MaterialData]:
+    if not material:
+        return None
+    return MaterialData(material.name, {key: (value[0], value[1]) for key, value in material.textures.items()})
+
+
+def _as_array(data, dtype, width):
+    array = np.asarray(data, dtype)
+    if array.size == 0:
+        return array.reshape((0, width))
+    return array
+
+
+def widen_influences(bone_ids, weights, width: int, counts: Optional[np.ndarray] = None):
+    """Pad (vertex, influence) bone id and weight arrays to width influences.
+
+    Only the first counts[n] influences of vertex n are kept, all of them when counts is None.
+    Padding has zero weight and repeats the first bone id of the vertex, so it never introduces
+    bone ids that were not referenced before.
+    """
+    bone_ids = np.asarray(bone_ids, np.int32)
+    weights = np.asarray(weights, np.float32)
+    kept = min(bone_ids.shape[1], width)
+    counts = np.full(len(bone_ids), kept) if counts is None else np.minimum(counts, kept)
+    padded_ids = np.zeros((len(bone_ids), width), np.int32)
+    padded_weights = np.zeros((len(bone_ids), width), np.float32)
+    padded_ids[:, :kept] = bone_ids[:, :kept]
+    padded_weights[:, :kept] = weights[:, :kept]
+    padding = np.arange(width) >= counts[:, None]
+    padded_ids = np.where(padding, padded_ids[:, :1] if kept else 0, padded_ids)
+    padded_weights[padding] = 0
+    return padded_ids, padded_weights
+
+
+def influences_as_arrays(bone_ids, weights):
+    """Per-vertex bone id and weight lists as two (vertex, influence) arrays, widened to the largest
+    influence count when vertices have different counts."""
+    try:
+        return _as_array(bone_ids, np.int32, 4), _as_array(weights, np.float32, 4)
+    except ValueError:
+        pass
+    counts = np.array([min(len(ids), len(wts)) for ids, wts in zip(bone_ids, weights)], np.int64)
+    width = int(counts.max())
+    filled = np.arange(width) < counts[:, None]
+    packed_ids = np.zeros((len(counts), width), np.int32)
+    packed_weights = np.zeros((len(counts), width), np.float32)
+    # Boolean assignment fills row by row, in the order the influences are listed
+    packed_ids[filled] = np.concatenate([np.asarray(ids[:count], np.int32)
+                                         for ids, count in zip(bone_ids, counts)])
+    packed_weights[filled] = np.concatenate([np.asarray(wts[:count], np.float32)
+                                             for wts, count in zip(weights, counts)])
+    return widen_influences(packed_ids, packed_weights, width, counts)
+
+
+def model_from_xna(model) -> ModelData:
+    """Copy a py_xna_lib model into NumPy backed ModelData."""
+    bones = [BoneData(bone.name, bone.parent_id, tuple(bone.blender_pos),
+                      tuple(bone.quat) if bone.quat else None,
+                      tuple(bone.blender_quat) if bone.quat else None)
+             for bone in model.bones]
+    meshes = []
+    for mesh in model.meshes:
+        bone_ids, weights = influences_as_arrays(mesh.bone_ids, mesh.weights)
+        meshes.append(MeshData(mesh.name,
+                               _as_array(mesh.vertices, np.float32, 3),
+                               _as_array(mesh.normals, np.float32, 3),
+                               _as_array(mesh.vertex_colors, np.float32, 4),
+                               {uv_id: _as_array(uv_data, np.float32, 2) for uv_id, uv_data in
+                                mesh.uv_layers.items()},
+                               _as_array(mesh.indices, np.int32, 3),
+                               bone_ids,
+                               weights,
+                               material_from_xna(mesh.material)))
+    return ModelData(bones, meshes)
+
+
+def model_to_payload(model: ModelData):
+    """Split ModelData into a JSON serializable description and a flat name -> array mapping."""
+    arrays = {}
+    meta = {'bones': [], 'meshes': []}
+    if model.bones:
+        arrays['bone_blender_pos'] = np.asarray([bone.blender_pos for bone in model.bones], np.float32)
+        arrays['bone_quat'] = np.asarray([bone.quat or (0, 0, 0, 0) for bone in model.bones], np.float32)
+        arrays['bone_blender_quat'] = np.asarray([bone.blender_quat or (0, 0, 0, 0) for bone in model.bones],
+                                                 np.float32)
+    for bone in model.bones:
+        meta['bones'].append({'name': bone.name, 'parent_id': bone.parent_id, 'has_quat': bone.quat is not None})
+    for n, mesh in enumerate(model.meshes):
+        prefix = f'mesh{n}_'
+        arrays[prefix + 'vertices'] = mesh.vertices
+        arrays[prefix + 'normals'] = mesh.normals
+        arrays[prefix + 'vertex_colors'] = mesh.vertex_colors
+        arrays[prefix + 'indices'] = mesh.indices
+        arrays[prefix + 'bone_ids'] = mesh.bone_ids
+        arrays[prefix + 'weights'] = mesh.weights
+        uv_ids = list(mesh.uv_layers.keys())
+        for i, uv_id in enumerate(uv_ids):
+            arrays[f'{prefix}uv{i}'] = mesh.uv_layers[uv_id]
+        material = None
+        if mesh.material is not None:
+            material = {'name': mesh.material.name,
+                        'textures': {key: list(value) for key, value in mesh.material.textures.items()}}
+        meta['meshes'].append({'name': mesh.name, 'uv_ids': uv_ids, 'material': material})
+    return meta, arrays
+
+
+def model_from_payload(meta: dict, arrays) -> ModelData:
+    bones = []
+    for n, bone in enumerate(meta['bones']):
+        has_quat = bone['has_quat']
+        bones.append(BoneData(bone['name'], bone['parent_id'],
+                              tuple(arrays['bone_blender_pos'][n].tolist()),
+                              tuple(arrays['bone_quat'][n].tolist()) if has_quat else None,
+                              tuple(arrays['bone_blender_quat'][n].tolist()) if has_quat else None))
+    meshes = []
+    for n, mesh in enumerate(meta['meshes']):
+        prefix = f'mesh{n}_'
+        material = None
+        if mesh['material'] is not None:
+            material = MaterialData(mesh['material']['name'],
+                                    {key: tuple(value) for key, value in mesh['material']['textures'].items()})
+        meshes.append(MeshData(mesh['name'],
+                               arrays[prefix + 'vertices'],
+                               arrays[prefix + 'normals'],
+                               arrays[prefix + 'vertex_colors'],
+                               {uv_id: arrays[f'{prefix}uv{i}'] for i, uv_id in enumerate(mesh['uv_ids'])},
+                               arrays[prefix + 'indices'],
+                               arrays[prefix + 'bone_ids'],
+                               arrays[prefix + 'weights'],
+                               material))
+    return ModelData(bones, meshes)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from . import py_xna_lib
+from .ascii_parser import parse_ascii_mesh as parse_ascii_mesh_numpy
+from .model_data import ModelData, model_from_xna, model_to_payload, model_from_payload
+from .py_xna_lib import parse_ascii_mesh_from_file
+from .xps_binary import parse_xps_binary
+
+PARSERS = {
+    'NATIVE': lambda path, external_skeleton: model_from_xna(
+        parse_ascii_mesh_from_file(path.as_posix(), external_skeleton)),
+    'NUMPY': parse_ascii_mesh_numpy,
+    'XPS': parse_xps_binary,
+}
+# Parsers of .ascii models, binary models never have a _skel.ascii companion
+ASCII_PARSERS = {'NATIVE', 'NUMPY'}
+
+# Bump when the on-disk layout or ModelData conversion changes
+CACHE_FORMAT_VERSION = 3
+PARSER_VERSION = f'{CACHE_FORMAT_VERSION}:{getattr(py_xna_lib, "__version__", "0")}'
+
+
+def default_cache_dir():
+    return Path(tempfile.gettempdir()) / 'blender_xna_cache'
+
+
+def _entry_stats(entry: Path) -> Optional[Tuple[float, int]]:
+    """Last use time and size of a cache entry, None if it was removed meanwhile."""
+    try:
+        size = sum(file.stat().st_size for file in entry.iterdir())
+        return (entry / 'meta.json').stat().st_mtime, size
+    except OSError:
+        return None
+
+
+class ParseCache:
+    """On-disk cache of parsed .ascii models.
+
+    Every entry is a directory holding meta.json and one uncompressed .npy file per array,
+    so hits are loaded with np.load(mmap_mode='r') without copying or text parsing.
+    Entries are keyed by path, size, mtime and parser version, least recently used entries
+    are evicted once the cache grows over size_limit bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, size_limit: int = 2 * 1024 ** 3, parser: str = 'NATIVE'):
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.size_limit = size_limit
+        self.parser = parser
+        self.hits = 0
+        self.misses = 0
+
+    def _source_id(self, path: Path, external_skeleton: bool):
+        return f'{path.absolute().as_posix()}|{external_skeleton}|{self.parser}'
+
+    def _entry_key(self, path: Path, external_skeleton: bool):
+        stat = path.stat()
+        key = f'{self._source_id(path, external_skeleton)}|{stat.st_size}|{stat.st_mtime_ns}|{PARSER_VERSION}'
+        return hashlib.sha1(key.encode('utf8')).hexdigest()
+
+    def load(self, path: Path, external_skeleton: bool = False) -> Optional[ModelData]:
+        entry = self.cache_dir / self._entry_key(path, external_skeleton)
+        meta_path = entry / 'meta.json'
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text('utf8'))
+            arrays = {name: np.load(entry / f'{name}.npy', mmap_mode='r') for name in meta['arrays']}
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        try:
+            # Used as the LRU timestamp for eviction
+            os.utime(meta_path)
+        except OSError:
+            # Evicted by another process meanwhile, the arrays are already loaded
+            pass
+        return model_from_payload(meta['model'], arrays)
+
+    def store(self, path: Path, model: ModelData, external_skeleton: bool = False):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        source_id = self._source_id(path, external_skeleton)
+        key = self._entry_key(path, external_skeleton)
+        meta, arrays = model_to_payload(model)
+        tmp_entry = Path(tempfile.mkdtemp(prefix=key, dir=self.cache_dir))
+        try:
+            for name, array in arrays.items():
+                np.save(tmp_entry / f'{name}.npy', np.ascontiguousarray(array))
+            (tmp_entry / 'meta.json').write_text(json.dumps({'source': source_id,
+                                                             'arrays': list(arrays.keys()),
+                                                             'model': meta}), 'utf8')
+            entry = self.cache_dir / key
+            shutil.rmtree(entry, ignore_errors=True)
+            tmp_entry.rename(entry)
+        except OSError:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+        try:
+            self._evict(source_id, key)
+        except OSError:
+            # Housekeeping only, the entry itself is stored
+            pass
+
+    def _evict(self, source_id: str, current_key: str):
+        # Other processes store and evict entries of the same directory concurrently,
+        # entries can vanish at any point
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            meta_path = entry / 'meta.json'
+            if entry.name == current_key or not meta_path.exists():
+                continue
+            try:
+                source = json.loads(meta_path.read_text('utf8'))['source']
+            except (OSError, ValueError, KeyError):
+                source = None
+            if source is None or source == source_id:
+                # Broken entry or an older version of the file we just cached
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            stats = _entry_stats(entry)
+            if stats is not None:
+                entries.append((*stats, entry))
+        current_stats = _entry_stats(self.cache_dir / current_key)
+        total = sum(size for _, size, _ in entries) + (current_stats[1] if current_stats else 0)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.size_limit:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def parse_ascii_mesh(self, path: Path, external_skeleton: bool = False) -> ModelData:
+        model = self.load(path, external_skeleton)
+        if model is not None:
+            self.hits += 1
+            return model
+        self.misses += 1
+        model = PARSERS[self.parser](path, external_skeleton)
+        self.store(path, model, external_skeleton)
+        return model
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .model_data import MaterialData, ModelData, material_from_xna
+from .parse_cache import ASCII_PARSERS, PARSERS, ParseCache
+from .py_xna_lib import parse_bone_names_from_file, parse_ascii_material_from_file
+
+PACKAGE_NAME = __name__.rpartition('.')[0]
+PACKAGE_DIR = Path(__file__).absolute().parent
+
+# Executed in every worker before any task is unpickled. Registers a bare package module so
+# submodules can be imported without running the add-on __init__, which needs bpy.
+_WORKER_BOOTSTRAP = '''
+import sys, types
+package = types.ModuleType({name!r})
+package.__path__ = [{path!r}]
+sys.modules.setdefault({name!r}, package)
+'''
+# How long iter_parse_files waits for the next bundle before yielding control back
+POLL_INTERVAL = 0.01
+
+
+@dataclass
+class FileBundle:
+    path: Path
+    model: ModelData
+    skeleton: Optional[ModelData] = None
+    remap_table: Optional[Dict[str, str]] = None
+    materials: Dict[str, MaterialData] = field(default_factory=dict)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    parse_seconds: float = 0.0
+
+
+def _external_skeleton_path(file: Path, parser: str) -> Optional[Path]:
+    # Only .ascii models have a _skel.ascii companion
+    skeleton_path = file.with_name(file.stem + '_skel.ascii')
+    return skeleton_path if parser in ASCII_PARSERS and skeleton_path.exists() else None
+
+
+def parse_file_bundle(file: Path, cache_dir: Optional[str] = None, cache_size: int = 0,
+                      parser: str = 'NATIVE') -> FileBundle:
+    """Parse a model together with its _skel.ascii companion, which only .ascii models have."""
+    start = time.perf_counter()
+    parse_cache = ParseCache(cache_dir, cache_size, parser) if cache_dir is not None else None
+
+    def parse_model(path: Path, external_skeleton: bool = False):
+        if parse_cache is not None:
+            return parse_cache.parse_ascii_mesh(path, external_skeleton)
+        return PARSERS[parser](path, external_skeleton)
+
+    external_skeleton_path = _external_skeleton_path(file, parser)
+    skeleton = None
+    if external_skeleton_path is not None:
+        skeleton = parse_model(external_skeleton_path)
+    model = parse_model(file, external_skeleton_path is not None)
+
+    bundle = FileBundle(file, model, skeleton, parse_seconds=time.perf_counter() - start)
+    if parse_cache is not None:
+        bundle.cache_hits, bundle.cache_misses = parse_cache.hits, parse_cache.misses
+    return bundle
+
+
+def load_cached_bundle(file: Path, cache_dir: str, cache_size: int = 0,
+                       parser: str = 'NATIVE') -> Optional[FileBundle]:
+    """Bundle of a file whose model and skeleton are both in the parse cache, None on a miss.
+
+    Hits are loaded in the calling process. Their arrays stay memory mapped, a pool worker would
+    copy them back through a pipe.
+    """
+    start = time.perf_counter()
+    parse_cache = ParseCache(cache_dir, cache_size, parser)
+    external_skeleton_path = _external_skeleton_path(file, parser)
+    skeleton = None
+    if external_skeleton_path is not None:
+        skeleton = parse_cache.load(external_skeleton_path)
+        if skeleton is None:
+            return None
+    model = parse_cache.load(file, external_skeleton_path is not None)
+    if model is None:
+        return None
+    return FileBundle(file, model, skeleton, cache_hits=2 if skeleton is not None else 1,
+                      parse_seconds=time.perf_counter() - start)
+
+
+def parse_material_file(amat_path: Path) -> MaterialData:
+    return material_from_xna(parse_ascii_material_from_file(amat_path.as_posix()))
+
+
+def _material_paths(bundle: FileBundle):
+    for mesh in bundle.model.meshes:
+        if mesh.material is not None:
+            amat_path = bundle.path.with_name(mesh.material.name + '.amat')
+            if amat_path.exists():
+                yield mesh.material.name, amat_path
+
+
+def _attach_materials(bundles: List[FileBundle], parsed: Optional[Dict[Path, MaterialData]] = None):
+    # .amat files shared by several models are parsed once per import
+    parsed = {} if parsed is None else parsed
+    amat_paths = list(dict.fromkeys(path for bundle in bundles for _, path in _material_paths(bundle)
+                                    if path not in parsed))
+    parsed.update(zip(amat_paths, map(parse_material_file, amat_paths)))
+    for bundle in bundles:
+        bundle.materials = {name: parsed[path] for name, path in _material_paths(bundle)}
+    return bundles
+
+
+def load_remap_table(remap_path: Path) -> Optional[Dict[str, str]]:
+    if remap_path.exists():
+        return dict(parse_bone_names_from_file(remap_path.as_posix()))
+    return None
+
+
+def load_directory_materials(directory: Path) -> Dict[str, MaterialData]:
+    """Parse every .amat file of a directory, keyed by material name."""
+    return {amat_path.stem: parse_material_file(amat_path) for amat_path in sorted(directory.glob('*.amat'))}
+
+
+def _attach_remap_tables(bundles: List[FileBundle], remap_tables: Optional[dict] = None):
+    # bonenames.txt is shared by every model in a directory, parse it once
+    remap_tables = {} if remap_tables is None else remap_tables
+    for bundle in bundles:
+        remap_path = bundle.path.with_name('bonenames.txt')
+        if remap_path not in remap_tables:
+            remap_tables[remap_path] = load_remap_table(remap_path)
+        bundle.remap_table = remap_tables[remap_path]
+    return bundles
+
+
+def iter_parse_files(files: List[Path], workers: int = 0, cache_dir: Optional[str] = None,
+                     cache_size: int = 0, parser: str = 'NATIVE',
+                     background: bool = False) -> Iterator[Optional[FileBundle]]:
+    """Parse files with their companion files in a process pool and yield their bundles in the order of files,
+    each as soon as it is parsed.
+
+    workers=0 uses one worker per CPU, workers=1 parses serially in the current process. With background
+    set, files are always parsed by workers, even a single one, so the caller never blocks for a whole parse.
+    Files found in the parse cache are loaded in the current process, only the others go to the pool.
+    While the pool is still parsing the next file, None is yielded every POLL_INTERVAL seconds so the caller
+    can do other work in between. Closing the iterator early drops the files not parsed yet.
+    """
+    materials = {}
+    remap_tables = {}
+
+    def attach(bundle: FileBundle) -> FileBundle:
+        return _attach_remap_tables(_attach_materials([bundle], materials), remap_tables)[0]
+
+    cached = {}
+    if cache_dir is not None:
+        cached = {file: load_cached_bundle(file, cache_dir, cache_size, parser) for file in files}
+    misses = [file for file in files if cached.get(file) is None]
+    workers = min(workers or os.cpu_count() or 1, len(misses))
+    if not misses or (workers <= 1 and not background):
+        for file in files:
+            yield attach(cached.get(file) or parse_file_bundle(file, cache_dir, cache_size, parser))
+        return
+
+    bootstrap = _WORKER_BOOTSTRAP.format(name=PACKAGE_NAME, path=PACKAGE_DIR.as_posix())
+    # Forking Blender is unsafe, always start fresh interpreters
+    mp_context = multiprocessing.get_context('spawn')
+    pool = ProcessPoolExecutor(workers, mp_context=mp_context, initializer=exec, initargs=(bootstrap, {}))
+    try:
+        futures = {file: pool.submit(parse_file_bundle, file, cache_dir, cache_size, parser) for file in misses}
+        for file in files:
+            bundle = cached.get(file)
+            if bundle is None:
+                future = futures[file]
+                while not wait([future], POLL_INTERVAL).done:
+                    yield None
+                bundle = future.result()
+            yield attach(bundle)
+    finally:
+        # Does not wait for files still being parsed when the caller stopped early
+        pool.shutdown(wait=False, cancel_futures=True)
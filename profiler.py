@@ -0,0 +1,130 @@
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active_profiler: Optional['ImportProfiler'] = None
+
+
+class ImportProfiler:
+    """Collects per file / per mesh phase timings, hot path counters and peak memory of one import.
+
+    Use as a context manager. While active, the module level phase() and count() helpers record
+    into it; otherwise they do nothing, so instrumented code costs nothing when profiling is off.
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.records: List[dict] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.file: Optional[str] = None
+        self.mesh: Optional[str] = None
+        self.peak_traced_memory = 0
+        self.total_seconds = 0.0
+        self._start = 0.0
+
+    def __enter__(self):
+        global _active_profiler
+        _active_profiler = self
+        if self.track_memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active_profiler
+        self.total_seconds = time.perf_counter() - self._start
+        if self.track_memory:
+            _, self.peak_traced_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        _active_profiler = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append({'phase': name, 'file': self.file, 'mesh': self.mesh,
+                                 'seconds': time.perf_counter() - start})
+
+    def phase_totals(self) -> Dict[str, float]:
+        totals = defaultdict(float)
+        for record in self.records:
+            totals[record['phase']] += record['seconds']
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    @staticmethod
+    def peak_rss():
+        if resource is None:
+            return None
+        # Kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def summary(self) -> str:
+        parts = [f'{name} {seconds:.2f}s' for name, seconds in self.phase_totals().items()]
+        text = f'Import {self.total_seconds:.2f}s: ' + ', '.join(parts)
+        if self.counters:
+            text += '; ' + ', '.join(f'{name} {value}' for name, value in sorted(self.counters.items()))
+        if self.peak_traced_memory:
+            text += f'; peak traced {self.peak_traced_memory / 1024 ** 2:.1f} MB'
+        return text
+
+    def to_dict(self) -> dict:
+        peak_rss = self.peak_rss()
+        return {
+            'total_seconds': self.total_seconds,
+            'phase_totals': self.phase_totals(),
+            'counters': dict(self.counters),
+            'peak_traced_memory': self.peak_traced_memory,
+            'peak_rss': peak_rss,
+            'records': self.records,
+        }
+
+    def write_json(self, path: Path):
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), 'utf8')
+
+
+@contextmanager
+def phase(name: str):
+    if _active_profiler is None:
+        yield
+        return
+    with _active_profiler.phase(name):
+        yield
+
+
+@contextmanager
+def scope(file: Optional[str] = None, mesh: Optional[str] = None):
+    """Attribute phases recorded inside the block to a file and/or mesh."""
+    if _active_profiler is None:
+        yield
+        return
+    previous = _active_profiler.file, _active_profiler.mesh
+    if file is not None:
+        _active_profiler.file = file
+    _active_profiler.mesh = mesh
+    try:
+        yield
+    finally:
+        _active_profiler.file, _active_profiler.mesh = previous
+
+
+def count(name: str, value: int = 1):
+    if _active_profiler is not None:
+        _active_profiler.counters[name] += value
+
+
+def record(name: str, seconds: float):
+    """Record a phase timed elsewhere, e.g. parsing done in a worker process."""
+    if _active_profiler is not None:
+        _active_profiler.records.append({'phase': name, 'file': _active_profiler.file, 'mesh': _active_profiler.mesh,
+                                         'seconds': seconds})
@@ -0,0 +1,164 @@
+"""Find datablocks created by earlier imports so an update import can rebuild only what changed.
+
+Imported objects are tagged with custom properties: the source file and submesh name on mesh
+objects, a content hash on their mesh data, and the source file and skeleton hash on armatures.
+Cancelled imports use DatablockSnapshot and ImportedDatablocks.rollback to undo their changes.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+
+SOURCE_KEY = 'XNA_SOURCE'
+MESH_KEY = 'XNA_MESH'
+HASH_KEY = 'XNA_HASH'
+SKELETON_KEY = 'XNA_SKELETON'
+# Every kind of datablock an import creates
+_ID_COLLECTIONS = ('objects', 'meshes', 'armatures', 'materials', 'images', 'node_groups')
+
+
+def source_id(path: Path) -> str:
+    return Path(path).absolute().as_posix()
+
+
+def tag_mesh_object(mesh_obj, source: str, mesh_name: str, content_hash: str):
+    mesh_obj[SOURCE_KEY] = source
+    mesh_obj[MESH_KEY] = mesh_name
+    mesh_obj.data[HASH_KEY] = content_hash
+
+
+def tag_armature_object(armature_obj, source: str, skeleton_key: Optional[str]):
+    if SOURCE_KEY not in armature_obj:
+        # Shared armatures keep the file that created them
+        armature_obj[SOURCE_KEY] = source
+    # Empty for bone-less models, those are only matched by source file
+    armature_obj[SKELETON_KEY] = skeleton_key or ''
+
+
+def replace_mesh_data(mesh_obj, mesh_data, keep_old: bool = False):
+    """Swap new geometry into an existing object, dropping the old mesh and vertex groups."""
+    old_data = mesh_obj.data
+    mesh_obj.data = mesh_data
+    mesh_obj.vertex_groups.clear()
+    if not keep_old and old_data.users == 0:
+        bpy.data.meshes.remove(old_data)
+
+
+class DatablockSnapshot:
+    """Datablocks that existed before an import, so a cancelled import can remove the ones it created."""
+
+    def __init__(self):
+        self._existing = {id_block.as_pointer() for id_block in self._all()}
+
+    @staticmethod
+    def _all():
+        for collection in _ID_COLLECTIONS:
+            yield from getattr(bpy.data, collection)
+
+    def remove_created(self) -> int:
+        created = [id_block for id_block in self._all() if id_block.as_pointer() not in self._existing]
+        bpy.data.batch_remove(created)
+        return len(created)
+
+
+class ImportedDatablocks:
+    """Index of objects tagged by previous imports, built once per import.
+
+    With undoable set, replaced meshes and armature tags are kept until commit(), so rollback()
+    can put previously imported objects back the way they were.
+    """
+
+    def __init__(self, undoable: bool = False):
+        # (mesh object, old mesh, old vertex group names, name of the new mesh)
+        self._replaced: Optional[List[tuple]] = [] if undoable else None
+        # (armature object, old tags)
+        self._retagged: List[tuple] = []
+        # Objects of every (source, submesh name), handed out in order as submeshes claim them
+        self._meshes: Dict[Tuple[str, str], List[object]] = {}
+        self._armatures_by_skeleton: Dict[str, object] = {}
+        self._armatures_by_source: Dict[str, object] = {}
+        self.skipped = 0
+        self.updated = 0
+        for obj in bpy.data.objects:
+            source = obj.get(SOURCE_KEY)
+            if source is None or obj.library is not None:
+                continue
+            if obj.type == 'MESH' and MESH_KEY in obj:
+                self._meshes.setdefault((source, obj[MESH_KEY]), []).append(obj)
+            elif obj.type == 'ARMATURE':
+                self._armatures_by_source.setdefault(source, obj)
+                if obj.get(SKELETON_KEY):
+                    self._armatures_by_skeleton.setdefault(obj[SKELETON_KEY], obj)
+
+    def claim_mesh_object(self, source: str, mesh_name: str):
+        """Next object imported from a submesh of source with this name, each object is handed out once.
+
+        Files can have several submeshes with the same name, they get their objects in import order.
+        """
+        objects = self._meshes.get((source, mesh_name))
+        return objects.pop(0) if objects else None
+
+    def is_unchanged(self, mesh_obj, content_hash: str) -> bool:
+        return mesh_obj is not None and mesh_obj.data is not None and mesh_obj.data.get(HASH_KEY) == content_hash
+
+    def armature_object(self, source: str, skeleton_key: Optional[str]) -> Tuple[Optional[object], bool]:
+        """Existing armature for a skeleton, or the one previously imported from source,
+        and whether its bones are up to date."""
+        armature_obj = self._armatures_by_skeleton.get(skeleton_key) if skeleton_key else None
+        if armature_obj is None:
+            armature_obj = self._armatures_by_source.get(source)
+        up_to_date = armature_obj is not None and armature_obj.get(SKELETON_KEY, '') == (skeleton_key or '')
+        return armature_obj, up_to_date
+
+    def replace_mesh(self, mesh_obj, mesh_data, name: str):
+        """Swap mesh_data into mesh_obj. It is renamed to name once the old mesh is removed,
+        while both exist Blender would give it a numbered suffix."""
+        if self._replaced is not None:
+            self._replaced.append((mesh_obj, mesh_obj.data, [group.name for group in mesh_obj.vertex_groups], name))
+        replace_mesh_data(mesh_obj, mesh_data, keep_old=self._replaced is not None)
+        if self._replaced is None:
+            mesh_data.name = name
+        self.updated += 1
+
+    def tag_armature(self, armature_obj, source: str, skeleton_key: Optional[str]):
+        if self._replaced is not None:
+            self._retagged.append((armature_obj, {key: armature_obj[key] for key in (SOURCE_KEY, SKELETON_KEY)
+                                                  if key in armature_obj}))
+        tag_armature_object(armature_obj, source, skeleton_key)
+        self.add_armature(armature_obj, source, skeleton_key)
+
+    def commit(self):
+        """Release what rollback() would need."""
+        for mesh_obj, old_data, _, name in self._replaced or ():
+            if old_data.users == 0:
+                bpy.data.meshes.remove(old_data)
+            mesh_obj.data.name = name
+        if self._replaced is not None:
+            self._replaced.clear()
+        self._retagged.clear()
+
+    def rollback(self):
+        """Give replaced objects their old mesh and vertex groups back and restore armature tags.
+
+        Weights live on the mesh, recreating the groups in the same order reconnects them.
+        """
+        if self._replaced is None:
+            return
+        for mesh_obj, old_data, group_names, _ in reversed(self._replaced):
+            mesh_obj.data = old_data
+            mesh_obj.vertex_groups.clear()
+            for name in group_names:
+                mesh_obj.vertex_groups.new(name=name)
+        for armature_obj, tags in reversed(self._retagged):
+            for key in (SOURCE_KEY, SKELETON_KEY):
+                if key in tags:
+                    armature_obj[key] = tags[key]
+                elif key in armature_obj:
+                    del armature_obj[key]
+        self._replaced.clear()
+        self._retagged.clear()
+
+    def add_armature(self, armature_obj, source: str, skeleton_key: Optional[str]):
+        if skeleton_key:
+            self._armatures_by_skeleton[skeleton_key] = armature_obj
+        self._armatures_by_source.setdefault(source, armature_obj)
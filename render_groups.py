@@ -0,0 +1,82 @@
+"""Texture roles of XNALara render groups.
+
+XNALara and XPS models store a mesh's textures as a plain list. What each texture is for follows from
+the render group, the number the mesh name starts with ("<group>_<name>_<specularity>..."). The roles
+use the same keys as py_xna_lib materials, generate_material() reads Diffuse, Normal and Specular.
+"""
+from typing import List
+
+DIFFUSE = 'Diffuse'
+LIGHTMAP = 'Lightmap'
+NORMAL = 'Normal'
+MASK = 'Mask'
+BUMP1 = 'Bump1'
+BUMP2 = 'Bump2'
+SPECULAR = 'Specular'
+ENVIRONMENT = 'Environment'
+EMISSION = 'Emission'
+# Small emission texture tiled over the mesh, used by the XPS glow groups
+EMISSION_MINI = 'EmissionMini'
+
+_FULL = [DIFFUSE, LIGHTMAP, NORMAL, MASK, BUMP1, BUMP2]
+
+RENDER_GROUP_TEXTURES = {
+    1: _FULL,
+    2: [DIFFUSE, LIGHTMAP, NORMAL],
+    3: [DIFFUSE, LIGHTMAP],
+    4: [DIFFUSE, NORMAL],
+    5: [DIFFUSE],
+    6: [DIFFUSE, NORMAL],
+    7: [DIFFUSE],
+    8: [DIFFUSE, LIGHTMAP, NORMAL],
+    9: [DIFFUSE, LIGHTMAP],
+    10: [DIFFUSE],
+    11: [DIFFUSE, NORMAL],
+    12: [DIFFUSE],
+    13: [DIFFUSE],
+    14: [DIFFUSE, NORMAL],
+    15: [DIFFUSE, NORMAL],
+    16: [DIFFUSE],
+    17: [DIFFUSE, LIGHTMAP],
+    18: [DIFFUSE, LIGHTMAP],
+    19: [DIFFUSE, LIGHTMAP],
+    20: _FULL,
+    21: [DIFFUSE],
+    22: _FULL + [SPECULAR],
+    23: _FULL + [SPECULAR],
+    24: [DIFFUSE, LIGHTMAP, NORMAL, SPECULAR],
+    25: [DIFFUSE, LIGHTMAP, NORMAL, SPECULAR],
+    26: [DIFFUSE, NORMAL, ENVIRONMENT, MASK],
+    27: [DIFFUSE, NORMAL, ENVIRONMENT, MASK],
+    28: [DIFFUSE, NORMAL, MASK, BUMP1, BUMP2, ENVIRONMENT],
+    29: [DIFFUSE, NORMAL, MASK, BUMP1, BUMP2, ENVIRONMENT],
+    30: [DIFFUSE, NORMAL, EMISSION],
+    31: [DIFFUSE, NORMAL, EMISSION],
+    32: [DIFFUSE],
+    33: [DIFFUSE],
+    36: [DIFFUSE, NORMAL, EMISSION_MINI],
+    37: [DIFFUSE, NORMAL, EMISSION_MINI],
+    38: [DIFFUSE, NORMAL, SPECULAR, EMISSION],
+    39: [DIFFUSE, NORMAL, SPECULAR, EMISSION],
+    40: [DIFFUSE, NORMAL, SPECULAR],
+    41: [DIFFUSE, NORMAL, SPECULAR],
+}
+# Only the first texture of an unknown render group is certain to be the diffuse map
+_UNKNOWN = [DIFFUSE]
+
+
+def render_group(mesh_name: str) -> int:
+    """Render group number a mesh name starts with, 0 when the name does not follow the convention."""
+    group = mesh_name.split('_', 1)[0].strip()
+    return int(group) if group.isdigit() else 0
+
+
+def texture_roles(mesh_name: str, texture_count: int) -> List[str]:
+    """Role of every texture of a mesh, in file order.
+
+    Textures past the end of the layout are named Texture<n>. For meshes without a known render
+    group that is every texture after the diffuse map, guessing a layout could bind a mask as a
+    normal map.
+    """
+    roles = RENDER_GROUP_TEXTURES.get(render_group(mesh_name), _UNKNOWN)
+    return [roles[n] if n < len(roles) else f'Texture{n}' for n in range(texture_count)]
@@ -0,0 +1,40 @@
+from typing import Dict
+
+from .import_plan import WeightPlan
+from .profiler import count
+
+# Vertex weights added between two steps of iter_assign_weights
+WEIGHT_CHUNK_VERTICES = 65536
+
+
+def iter_assign_weights(mesh_obj, plan: WeightPlan, chunk_vertices: int = WEIGHT_CHUNK_VERTICES):
+    """Create planned vertex groups on mesh_obj and fill them with one VertexGroup.add call per bucket.
+
+    Yields after roughly every chunk_vertices weights, larger buckets are split, so callers can spread
+    the work over several steps. Returns the vertex groups by name.
+    """
+    weight_groups: Dict[str, object] = {name: mesh_obj.vertex_groups.new(name=name) for name in plan.group_names}
+    calls = 0
+    added = 0
+    for group_name, weight, vertices in plan.buckets:
+        for start in range(0, len(vertices), chunk_vertices):
+            chunk = vertices[start:start + chunk_vertices] if len(vertices) > chunk_vertices else vertices
+            weight_groups[group_name].add(chunk, weight, 'REPLACE')
+            calls += 1
+            added += len(chunk)
+            if added >= chunk_vertices:
+                added = 0
+                yield
+    count('rna_bulk_calls', calls)
+    count('python_loop_iterations', len(plan.buckets) + len(plan.group_names))
+    return weight_groups
+
+
+def assign_weights(mesh_obj, plan: WeightPlan):
+    """Create planned vertex groups on mesh_obj and fill them in one go."""
+    steps = iter_assign_weights(mesh_obj, plan)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent / 'benchmarks'))
+from common import import_addon_module  # noqa: E402
+
+parse_ascii_mesh = import_addon_module('ascii_parser').parse_ascii_mesh
+
+# Influence counts 2, 1 and 3 add up to the same value count as three vertices with 2 influences
+VARYING_INFLUENCES = """1
+bone0
+-1
+0 0 0
+1
+mesh
+1
+0
+3
+0 0 0
+0 0 1
+255 255 255 255
+0 0
+0 1
+0.5 0.5
+1 0 0
+0 0 1
+255 255 255 255
+1 0
+1
+1.0
+0 1 0
+0 0 1
+255 255 255 255
+0 1
+1 0 0
+0.3 0.5 0.2
+1
+0 1 2
+"""
+
+
+def test_varying_influences_in_one_chunk(tmp_path):
+    path = tmp_path / 'varying.ascii'
+    path.write_text(VARYING_INFLUENCES)
+    mesh = parse_ascii_mesh(path).meshes[0]
+    # Missing influences reuse the first bone id of the vertex with zero weight
+    assert mesh.bone_ids.tolist() == [[0, 1, 0], [1, 1, 1], [1, 0, 0]]
+    np.testing.assert_allclose(mesh.weights, [[0.5, 0.5, 0], [1, 0, 0], [0.3, 0.5, 0.2]])
+    np.testing.assert_allclose(mesh.uv_layers[0], [[0, 0], [1, 0], [0, 1]])
+    assert mesh.indices.tolist() == [[0, 1, 2]]
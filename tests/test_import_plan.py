@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent / 'benchmarks'))
+from common import import_addon_module  # noqa: E402
+
+import_plan = import_addon_module('import_plan')
+model_data = import_addon_module('model_data')
+
+
+def make_mesh(name, vertex_count, indices, uv_layers, bone_ids, weights, material=None):
+    vertices = np.arange(vertex_count * 3, dtype=np.float32).reshape((vertex_count, 3))
+    return model_data.MeshData(name, vertices, np.ones((vertex_count, 3), np.float32),
+                               np.ones((vertex_count, 4), np.float32),
+                               {uv_id: np.full((vertex_count, 2), value, np.float32)
+                                for uv_id, value in uv_layers.items()},
+                               np.array(indices, np.int32), np.array(bone_ids, np.int32),
+                               np.array(weights, np.float32), material)
+
+
+def sample_meshes():
+    first = make_mesh('first', 3, [[0, 1, 2]], {0: 0.25, 1: 0.5}, [[0, 1], [1, 0], [2, 1]],
+                      [[0.5, 0.5], [1, 0], [0.75, 0.25]])
+    second = make_mesh('second', 4, [[0, 1, 2], [1, 2, 3]], {0: 0.75}, [[1, 0, 2], [2, 1, 0], [0, 0, 0], [1, 1, 1]],
+                       [[0.5, 0.3, 0.2], [1, 0, 0], [1, 0, 0], [0.5, 0.25, 0.25]])
+    third = make_mesh('third', 3, [[2, 1, 0]], {0: 1.0}, [[2], [0], [1]], [[1], [1], [1]])
+    return [first, second, third]
+
+
+def test_merge_offsets_face_indices():
+    merged = import_plan.merge_meshes('merged', sample_meshes())
+    assert merged.indices.tolist() == [[0, 1, 2], [3, 4, 5], [4, 5, 6], [9, 8, 7]]
+    assert len(merged.vertices) == 10
+    np.testing.assert_array_equal(merged.vertices[3], [0, 1, 2])
+
+
+def test_merge_zero_fills_missing_uv_layers():
+    merged = import_plan.merge_meshes('merged', sample_meshes())
+    assert sorted(merged.uv_layers) == [0, 1]
+    np.testing.assert_array_equal(merged.uv_layers[0][:, 0], [0.25] * 3 + [0.75] * 4 + [1.0] * 3)
+    np.testing.assert_array_equal(merged.uv_layers[1][:, 0], [0.5] * 3 + [0] * 7)
+
+
+def test_merge_widens_influences():
+    merged = import_plan.merge_meshes('merged', sample_meshes())
+    # Padding reuses the first bone id of the vertex with zero weight
+    assert merged.bone_ids.tolist() == [[0, 1, 0], [1, 0, 1], [2, 1, 2],
+                                        [1, 0, 2], [2, 1, 0], [0, 0, 0], [1, 1, 1],
+                                        [2, 2, 2], [0, 0, 0], [1, 1, 1]]
+    np.testing.assert_allclose(merged.weights[:3], [[0.5, 0.5, 0], [1, 0, 0], [0.75, 0.25, 0]])
+    np.testing.assert_allclose(merged.weights[7:], [[1, 0, 0]] * 3)
+
+
+def test_merged_plan_assigns_material_slots():
+    body = model_data.MaterialData('body')
+    hair = model_data.MaterialData('hair')
+    meshes = sample_meshes()
+    plan = import_plan.plan_merged_mesh('merged', meshes, [hair, None, body], bone_names=['a', 'b', 'c'])
+    assert [material.name for material in plan.materials] == ['hair', 'body']
+    # Faces without a material keep the first slot
+    assert plan.face_material_ids.tolist() == [0, 0, 0, 1]
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent / 'benchmarks'))
+from common import import_addon_module  # noqa: E402
+
+texture_roles = import_addon_module('render_groups').texture_roles
+
+
+def test_roles_follow_render_group():
+    assert texture_roles('4_body_0.5_1_1', 2) == ['Diffuse', 'Normal']
+    assert texture_roles('24_hair_0.3', 4) == ['Diffuse', 'Lightmap', 'Normal', 'Specular']
+
+
+def test_later_render_groups():
+    assert texture_roles('28_skin', 6) == ['Diffuse', 'Normal', 'Mask', 'Bump1', 'Bump2', 'Environment']
+    assert texture_roles('38_lamp', 4) == ['Diffuse', 'Normal', 'Specular', 'Emission']
+
+
+def test_unknown_render_group_only_names_diffuse():
+    assert texture_roles('body', 3) == ['Diffuse', 'Texture1', 'Texture2']
+    assert texture_roles('34_glass', 2) == ['Diffuse', 'Texture1']
+    assert texture_roles('5_eyes', 2) == ['Diffuse', 'Texture1']
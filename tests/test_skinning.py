@@ -0,0 +1,95 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent / 'benchmarks'))
+from common import import_addon_module  # noqa: E402
+
+plan_weights = import_addon_module('import_plan').plan_weights
+assign_weights = import_addon_module('skinning').assign_weights
+
+
+class FakeVertexGroup:
+    def __init__(self, name):
+        self.name = name
+        self.weights = {}
+
+    def add(self, vertices, weight, mode):
+        assert mode == 'REPLACE'
+        for vertex in vertices:
+            # Blender stores weights as 32 bit floats
+            self.weights[vertex] = np.float32(weight)
+
+
+class FakeVertexGroups(list):
+    def new(self, name):
+        # Blender makes duplicated names unique the same way
+        names = {group.name for group in self}
+        unique_name = name
+        suffix = 0
+        while unique_name in names:
+            suffix += 1
+            unique_name = f'{name}.{suffix:03}'
+        self.append(FakeVertexGroup(unique_name))
+        return self[-1]
+
+
+class FakeObject:
+    def __init__(self):
+        self.vertex_groups = FakeVertexGroups()
+
+
+def snapshot(mesh_obj):
+    return {(vertex, group.name): weight
+            for group in mesh_obj.vertex_groups for vertex, weight in group.weights.items()}
+
+
+def per_influence_weights(bone_ids, weights, bone_names):
+    """The importer's original skinning loop, one VertexGroup.add per influence."""
+    mesh_obj = FakeObject()
+    weight_groups = {name: mesh_obj.vertex_groups.new(name=name) for name in bone_names}
+    for n, (bone_indices, bone_weights) in enumerate(zip(bone_ids, weights)):
+        for bone_index, weight in zip(bone_indices, bone_weights):
+            if weight > 0:
+                weight_groups[bone_names[bone_index]].add([n], weight, 'REPLACE')
+    return mesh_obj
+
+
+def bucketed_weights(bone_ids, weights, bone_names):
+    mesh_obj = FakeObject()
+    assign_weights(mesh_obj, plan_weights(bone_ids, weights, bone_names))
+    return mesh_obj
+
+
+def assert_same_groups(bone_ids, weights, bone_names):
+    expected = per_influence_weights(bone_ids, weights, bone_names)
+    result = bucketed_weights(bone_ids, weights, bone_names)
+    assert [group.name for group in result.vertex_groups] == [group.name for group in expected.vertex_groups]
+    assert snapshot(result) == snapshot(expected)
+
+
+def test_full_precision_weights():
+    rng = np.random.default_rng(0)
+    bone_ids = rng.integers(0, 16, (2000, 4))
+    weights = rng.random((2000, 4))
+    weights[rng.random((2000, 4)) < 0.3] = 0
+    assert_same_groups(bone_ids.tolist(), weights.tolist(), [f'bone_{n}' for n in range(16)])
+
+
+def test_duplicated_influences_keep_the_last_weight():
+    bone_ids = [[0, 0, 1], [1, 0, 1], [2, 2, 2]]
+    weights = [[0.25, 0.75, 0.5], [0.5, 0.1, 0.3], [0.2, 0, 0.4]]
+    assert_same_groups(bone_ids, weights, ['a', 'b', 'c'])
+
+
+def test_ragged_influence_lists():
+    bone_ids = [[0], [1, 2, 0], [], [2, 1]]
+    weights = [[1.0], [0.5, 0.25], [0.3], [0.6, 0.4, 0.9]]
+    assert_same_groups(bone_ids, weights, ['a', 'b', 'c'])
+
+
+def test_repeated_bone_names_share_a_group():
+    bone_ids = [[0, 1], [1, 2], [2, 0], [0, 2]]
+    weights = [[0.5, 0.5], [0.7, 0.3], [0.6, 0.4], [0.2, 0.8]]
+    assert_same_groups(bone_ids, weights, ['a', 'b', 'a'])
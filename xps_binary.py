@@ -0,0 +1,195 @@
+"""NumPy parser for binary XNALara models (.mesh) and XPS models (.xps).
+
+Vertex and face streams are decoded with np.frombuffer over a structured dtype built from the
+mesh layout, so a whole stream becomes arrays in one call instead of unpacking field by field.
+"""
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .model_data import BoneData, MaterialData, MeshData, ModelData, influences_as_arrays
+from .render_groups import texture_roles
+
+XPS_MAGIC = 323232
+# Strings are prefixed with a 7 bit encoded length
+_STRING_LENGTH_LIMIT = 128
+_OPTION_POSE = 1
+_OPTION_FLAGS = 2
+
+
+class XpsParseError(ValueError):
+    pass
+
+
+class XpsHeader:
+    def __init__(self, version_major: int = 0, version_minor: int = 0):
+        self.version_major = version_major
+        self.version_minor = version_minor
+
+    @property
+    def has_tangents(self):
+        return self.version_major <= 2 and self.version_minor <= 12
+
+    @property
+    def has_variable_weights(self):
+        return self.version_major >= 3
+
+
+class _BinaryReader:
+    def __init__(self, buffer: bytes):
+        self.buffer = buffer
+        self.offset = 0
+
+    def _check(self, size: int):
+        if self.offset + size > len(self.buffer):
+            raise XpsParseError(f'Unexpected end of file at offset {self.offset}, {size} more bytes needed')
+
+    def array(self, dtype, count: int) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        self._check(dtype.itemsize * count)
+        result = np.frombuffer(self.buffer, dtype, count, self.offset)
+        self.offset += dtype.itemsize * count
+        return result
+
+    def value(self, dtype):
+        return self.array(dtype, 1)[0].item()
+
+    def uint32(self) -> int:
+        return self.value('<u4')
+
+    def string(self) -> str:
+        length = self.value('u1')
+        if length >= _STRING_LENGTH_LIMIT:
+            length = length % _STRING_LENGTH_LIMIT + self.value('u1') * _STRING_LENGTH_LIMIT
+        self._check(length)
+        data = self.buffer[self.offset:self.offset + length]
+        self.offset += length
+        return data.decode('utf8', errors='replace')
+
+    def skip(self, size: int):
+        self._check(size)
+        self.offset += size
+
+
+def _read_header(reader: _BinaryReader) -> XpsHeader:
+    reader.uint32()
+    header = XpsHeader(reader.value('<u2'), reader.value('<u2'))
+    reader.string()  # XNAaral
+    settings_length = reader.uint32()
+    reader.string()  # machine name
+    reader.string()  # user name
+    reader.string()  # files
+    if header.has_tangents:
+        reader.skip(settings_length * 4)
+        return header
+
+    # Newer versions store a list of typed options, none of which affect the geometry
+    settings_start = reader.offset
+    reader.uint32()  # hash
+    for _ in range(reader.uint32()):
+        option_type = reader.uint32()
+        option_count = reader.uint32()
+        reader.uint32()  # option info
+        if option_type == _OPTION_POSE:
+            # Default pose as text, padded to a multiple of 4 bytes
+            reader.skip(-(-option_count // 4) * 4)
+        elif option_type == _OPTION_FLAGS:
+            reader.skip(option_count * 8)
+        elif option_type == 0:
+            reader.skip(option_count * 4)
+        else:
+            break
+    reader.offset = max(reader.offset, settings_start + settings_length * 4)
+    return header
+
+
+def _read_bones(reader: _BinaryReader) -> List[BoneData]:
+    bones = []
+    for _ in range(reader.uint32()):
+        name = reader.string()
+        parent_id = reader.value('<i2')
+        x, y, z = reader.array('<f4', 3).tolist()
+        bones.append(BoneData(name, parent_id, (z, x, y)))
+    return bones
+
+
+def vertex_dtype(uv_layer_count: int, has_tangents: bool, influences: int,
+                 influence_count_field: bool = False) -> np.dtype:
+    """Structured dtype of one vertex as laid out in the file."""
+    fields = [('position', '<f4', 3), ('normal', '<f4', 3), ('color', 'u1', 4)]
+    for n in range(uv_layer_count):
+        fields.append((f'uv{n}', '<f4', 2))
+        if has_tangents:
+            fields.append((f'tangent{n}', '<f4', 4))
+    if influence_count_field:
+        fields.append(('influence_count', '<u2'))
+    if influences:
+        fields += [('bone_ids', '<i2', influences), ('weights', '<f4', influences)]
+    return np.dtype(fields)
+
+
+def _read_variable_vertices(reader: _BinaryReader, count: int, uv_layer_count: int, has_tangents: bool):
+    prefix = vertex_dtype(uv_layer_count, has_tangents, 0)
+    if not count:
+        return np.empty(0, prefix), np.zeros((0, 0), np.int32), np.zeros((0, 0), np.float32)
+    # Exporters write the same influence count for every vertex, try that layout as one stream first
+    count_offset = reader.offset + prefix.itemsize
+    influences = int.from_bytes(reader.buffer[count_offset:count_offset + 2], 'little')
+    dtype = vertex_dtype(uv_layer_count, has_tangents, influences, True)
+    if influences and reader.offset + dtype.itemsize * count <= len(reader.buffer):
+        records = np.frombuffer(reader.buffer, dtype, count, reader.offset)
+        if (records['influence_count'] == influences).all():
+            reader.offset += dtype.itemsize * count
+            return records, records['bone_ids'], records['weights']
+
+    records = np.empty(count, prefix)
+    bone_ids = []
+    weights = []
+    for n in range(count):
+        records[n] = reader.array(prefix, 1)[0]
+        influences = reader.value('<u2')
+        bone_ids.append(reader.array('<i2', influences))
+        weights.append(reader.array('<f4', influences))
+    bone_ids, weights = influences_as_arrays(bone_ids, weights)
+    return records, bone_ids, weights
+
+
+def _read_mesh(reader: _BinaryReader, header: Optional[XpsHeader], has_bones: bool) -> MeshData:
+    name = reader.string()
+    uv_layer_count = reader.uint32()
+    textures = [(reader.string(), reader.uint32()) for _ in range(reader.uint32())]
+    textures = dict(zip(texture_roles(name, len(textures)), textures))
+    vertex_count = reader.uint32()
+
+    has_tangents = header is None or header.has_tangents
+    variable_weights = has_bones and header is not None and header.has_variable_weights
+    if variable_weights:
+        records, bone_ids, weights = _read_variable_vertices(reader, vertex_count, uv_layer_count, has_tangents)
+    else:
+        records = reader.array(vertex_dtype(uv_layer_count, has_tangents, 4 if has_bones else 0), vertex_count)
+        if has_bones:
+            bone_ids, weights = records['bone_ids'], records['weights']
+        else:
+            bone_ids, weights = np.zeros((vertex_count, 0), np.int16), np.zeros((vertex_count, 0), np.float32)
+
+    indices = reader.array('<u4', reader.uint32() * 3).reshape((-1, 3))
+    return MeshData(name,
+                    np.array(records['position'], np.float32),
+                    np.array(records['normal'], np.float32),
+                    records['color'] * np.float32(1 / 255),
+                    {n: np.array(records[f'uv{n}'], np.float32) for n in range(uv_layer_count)},
+                    indices.astype(np.int32),
+                    bone_ids.astype(np.int32),
+                    np.array(weights, np.float32),
+                    MaterialData(name, textures))
+
+
+def parse_xps_binary(path: Path, external_skeleton: bool = False) -> ModelData:
+    """Parse a .mesh or .xps file. Binary models always carry their own skeleton, external_skeleton is ignored."""
+    reader = _BinaryReader(Path(path).read_bytes())
+    # .xps files start with a versioned header, .mesh files go straight to the bones
+    header = _read_header(reader) if reader.buffer[:4] == XPS_MAGIC.to_bytes(4, 'little') else None
+    bones = _read_bones(reader)
+    meshes = [_read_mesh(reader, header, bool(bones)) for _ in range(reader.uint32())]
+    return ModelData(bones, meshes)